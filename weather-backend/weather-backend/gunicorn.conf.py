@@ -0,0 +1,12 @@
+# gunicorn.conf.py
+# Production server: gunicorn -c gunicorn.conf.py main:app
+import os
+
+bind = os.getenv("BIND", "0.0.0.0:8000")
+
+# Uvicorn worker runs uvloop + httptools when they are installed
+worker_class = "uvicorn.workers.UvicornWorker"
+workers = int(os.getenv("WEB_CONCURRENCY", 2 * (os.cpu_count() or 1) + 1))
+
+keepalive = 30
+timeout = 120
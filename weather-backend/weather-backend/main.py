@@ -1,7 +1,16 @@
 # main.py
+from contextlib import asynccontextmanager
 from dotenv import load_dotenv
 from fastapi import FastAPI
+from fastapi.responses import ORJSONResponse
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
+try:
+    from brotli_asgi import BrotliMiddleware
+except ImportError:  # Brotli is optional; GZip is used instead
+    BrotliMiddleware = None
+from middleware import ETagMiddleware
+from services import http_client
 from routers import probability, locations, air_quality, simple_forecast
 
 # Routers (ensure routers/__init__.py exists and these files define `router = APIRouter()`)
@@ -10,6 +19,15 @@ from routers import probability, locations, air_quality
 # Load environment variables if any (e.g., API keys, config)
 load_dotenv()
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # One pooled async HTTP client for all outbound calls (NASA POWER, geocoding), reused across requests
+    app.state.http = http_client.create_client()
+    http_client.set_client(app.state.http)
+    yield
+    http_client.set_client(None)
+    await app.state.http.aclose()
+
 app = FastAPI(
     title="NASA Weather & Air Quality Analytics API",
     description=(
@@ -19,6 +37,9 @@ app = FastAPI(
     version="2.0.0",
     docs_url="/docs",
     redoc_url="/redoc",
+    lifespan=lifespan,
+    # orjson is several times faster than stdlib json on the larger payloads (histograms, events)
+    default_response_class=ORJSONResponse,
 )
 
 # CORS for local dev and easy frontend integration; tighten in production
@@ -30,6 +51,16 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# ETag + Cache-Control on GET /api/* JSON responses; If-None-Match hits return 304
+app.add_middleware(ETagMiddleware)
+
+# Added last so it wraps everything: ETags are computed on the uncompressed body.
+# Brotli when available (gzip for clients without "br"), otherwise plain GZip.
+if BrotliMiddleware is not None:
+    app.add_middleware(BrotliMiddleware, quality=4, minimum_size=1024, gzip_fallback=True)
+else:
+    app.add_middleware(GZipMiddleware, minimum_size=1024)
+
 # Mount feature routers under /api
 app.include_router(probability.router, prefix="/api", tags=["Extreme Weather Probability"])
 app.include_router(locations.router,   prefix="/api", tags=["Location Services"])
@@ -46,3 +77,11 @@ def health():
 
 # Run locally:
 # uvicorn main:app --reload
+#
+# Run in production (uvloop event loop + httptools parser, one worker per core):
+# gunicorn -c gunicorn.conf.py main:app
+# or, without gunicorn:
+# uvicorn main:app --loop uvloop --http httptools --workers $((2 * $(nproc) + 1))
+#
+# Each worker keeps its own NASA response cache (services/nasa_cache.py), bounded by
+# NASA_SERIES_CACHE_MB + NASA_RAW_CACHE_MB (default 48 + 16 MB)
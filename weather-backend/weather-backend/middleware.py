@@ -0,0 +1,83 @@
+# middleware.py
+"""
+HTTP caching for the JSON API.
+Responses are deterministic for a day (the 20-year window rolls daily), so every
+successful GET under /api gets a weak ETag and a Cache-Control header; a request
+whose If-None-Match matches is answered with an empty 304.
+"""
+
+import hashlib
+from starlette.datastructures import Headers, MutableHeaders
+
+DEFAULT_CACHE_CONTROL = "public, max-age=3600, stale-while-revalidate=86400"
+
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    # Weak comparison (RFC 9110): W/ prefixes are ignored
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(tag.strip().removeprefix("W/") == opaque for tag in if_none_match.split(","))
+
+
+class ETagMiddleware:
+    """Pure ASGI middleware; buffers only the JSON responses it tags"""
+
+    def __init__(self, app, cache_control: str = DEFAULT_CACHE_CONTROL, path_prefix: str = "/api"):
+        self.app = app
+        self.cache_control = cache_control
+        self.path_prefix = path_prefix
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] != "GET" or not scope["path"].startswith(self.path_prefix):
+            await self.app(scope, receive, send)
+            return
+
+        if_none_match = Headers(scope=scope).get("if-none-match")
+        start_message = None
+        body = []
+        passthrough = False
+
+        async def send_with_etag(message):
+            nonlocal start_message, passthrough
+
+            if message["type"] == "http.response.start":
+                headers = Headers(raw=message["headers"])
+                tagged = (
+                    message["status"] == 200
+                    and headers.get("content-type", "").startswith("application/json")
+                    and "etag" not in headers
+                )
+                if not tagged:
+                    passthrough = True
+                    await send(message)
+                else:
+                    start_message = message
+                return
+
+            if passthrough or message["type"] != "http.response.body":
+                await send(message)
+                return
+
+            body.append(message.get("body", b""))
+            if message.get("more_body", False):
+                return
+
+            content = b"".join(body)
+            etag = f'W/"{hashlib.sha1(content).hexdigest()}"'
+            headers = MutableHeaders(scope=start_message)
+            headers["ETag"] = etag
+            if "cache-control" not in headers:
+                headers["Cache-Control"] = self.cache_control
+
+            if if_none_match and etag_matches(if_none_match, etag):
+                del headers["content-length"]
+                del headers["content-type"]
+                await send({**start_message, "status": 304})
+                await send({"type": "http.response.body", "body": b""})
+                return
+
+            await send(start_message)
+            await send({"type": "http.response.body", "body": content})
+
+        await self.app(scope, receive, send_with_etag)
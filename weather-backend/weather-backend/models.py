@@ -1,20 +1,25 @@
 # models.py
-from typing import List, Optional, Literal, Annotated
+from typing import List, Optional, Literal, Annotated, Union
 from pydantic import BaseModel, Field
 
 class Coordinate(BaseModel):
     lat: float = Field(..., ge=-90, le=90, description="Latitude")
     lon: float = Field(..., ge=-180, le=180, description="Longitude")
 
-class RegionRequest(BaseModel):
+# Most locations one area request may fetch (explicit points plus the sampled polygon);
+# each one is a separate 20-year NASA POWER download
+MAX_AREA_SAMPLES = 256
+
+class AreaSelection(BaseModel):
     # Either points or polygon; polygon must have >= 3 coordinates
-    points: Optional[List[Coordinate]] = Field(
+    points: Optional[Annotated[List[Coordinate], Field(max_length=MAX_AREA_SAMPLES)]] = Field(
         default=None, description="Optional array of points (lat/lon)"
     )
     polygon: Optional[Annotated[List[Coordinate], Field(min_length=3)]] = Field(
         default=None, description="Optional polygon (>=3 coordinates)"
     )
 
+class RegionRequest(AreaSelection):
     # Time selectors (choose one of month/season/doy)
     month: Optional[int] = Field(None, ge=1, le=12, description="Month filter 1-12")
     season: Optional[Literal["djf","mam","jja","son"]] = Field(
@@ -41,4 +46,10 @@ class HistogramRequest(BaseModel):
     doy: Optional[int] = Field(None, ge=1, le=366)
     start_year: Optional[int] = None
     end_year: Optional[int] = None
-    bins: int = Field(24, ge=4, le=200, description="Histogram bin count")
+    bins: Union[Annotated[int, Field(ge=4, le=200)], Literal["fixed"]] = Field(
+        24, description='Histogram bin count, or "fixed" for static per-parameter edges'
+    )
+
+class AreaForecastRequest(AreaSelection):
+    date: str = Field(..., description="Date in YYYY-MM-DD format")
+    time: str = Field("12:00", description="Time in HH:MM format")
@@ -11,7 +11,7 @@ async def get_air_quality_risk(
     month: Optional[int] = Query(None, ge=1, le=12, description="Month (1-12)")
 ):
     month = month or 6
-    result = get_air_quality_probability(lat, lon, month)
+    result = await get_air_quality_probability(lat, lon, month)
     if not result:
         raise HTTPException(status_code=500, detail="Failed to calculate air quality probability")
     p = result["poor_air_quality_probability"]
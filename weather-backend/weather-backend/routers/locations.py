@@ -1,34 +1,43 @@
-from fastapi import APIRouter, Query, HTTPException
-import requests
+from fastapi import APIRouter, Query, HTTPException, Request
+from cachetools import TTLCache
+import httpx
 
 router = APIRouter()
 
+# City -> coordinates rarely changes; cache lookups for a week (keyed on normalized city name)
+_geocode_cache = TTLCache(maxsize=10_000, ttl=7 * 86400)
+
 @router.get("/location/geocode")
-async def geocode_location(city: str = Query(..., description="City name (e.g., 'Delhi', 'Mumbai')")):
+async def geocode_location(request: Request, city: str = Query(..., description="City name (e.g., 'Delhi', 'Mumbai')")):
     """
     Convert city name to latitude/longitude coordinates using OpenStreetMap Nominatim
     """
+    key = city.strip().lower()
+    cached = _geocode_cache.get(key)
+    if cached is not None:
+        return {"city": city, **cached}
+    
     url = "https://nominatim.openstreetmap.org/search"
     params = {
         "q": city,
         "format": "json",
         "limit": 1
     }
-    headers = {"User-Agent": "WeatherProbabilityApp/1.0"}
     
     try:
-        response = requests.get(url, params=params, headers=headers, timeout=10)
+        response = await request.app.state.http.get(url, params=params, timeout=10)
         response.raise_for_status()
         data = response.json()
         
         if not data:
             raise HTTPException(status_code=404, detail=f"Location '{city}' not found")
         
-        return {
-            "city": city,
+        location = {
             "latitude": float(data[0]["lat"]),
             "longitude": float(data[0]["lon"]),
             "display_name": data[0]["display_name"]
         }
-    except requests.exceptions.RequestException as e:
+        _geocode_cache[key] = location
+        return {"city": city, **location}
+    except httpx.HTTPError as e:
         raise HTTPException(status_code=500, detail=f"Geocoding service error: {str(e)}")
@@ -1,74 +1,136 @@
 # routers/probability.py
 from fastapi import APIRouter, HTTPException, Query, Body
-from fastapi.responses import StreamingResponse
-from typing import List, Tuple, Optional
-import datetime, io, csv, numpy as np
+from pydantic import Field
+from fastapi.responses import StreamingResponse, ORJSONResponse
+from typing import Optional, Literal, Union, Annotated
+import datetime, numpy as np
+from cachetools import TTLCache
 
-from services.nasa_power import get_nasa_power_data
-from services.thresholds import EXTREME_WEATHER_THRESHOLDS
+from services.nasa_cache import get_cached_series_for_points, history_window
+from services.nasa_client import get_series
+from services.thresholds import EXTREME_WEATHER_THRESHOLDS, evaluate_all
 from utils.calculations import (
-    filter_data_by_month, calculate_probability, calculate_extreme_statistics,
-    filter_by_year_range, filter_by_season, filter_by_doy, summarize_values,
-    make_histogram, analyze_trend_yearly_extremes, sample_polygon_to_grid
+    COMPARE, calculate_probability, calculate_extreme_statistics,
+    month_mask, select_mask, summarize_values,
+    make_histogram, has_fixed_edges, analyze_trend_yearly_extremes, sample_area
 )
-from models import RegionRequest, HistogramRequest
+from utils.parsed_series import MISSING_VALUE
+from models import MAX_AREA_SAMPLES, RegionRequest, HistogramRequest
 
 router = APIRouter()
+
+# Rows per chunk written to the CSV stream
+CSV_CHUNK_ROWS = 500
+
 @router.get("/download-report", tags=["Data Export"])
 async def download_weather_report(
     lat: float,
     lon: float,
     condition_type: str,
     month: Optional[int] = None,
-    format: str = Query("csv", regex="^(csv|json)$")
+    format: Literal["csv", "json"] = Query("csv")
 ):
     """
     Download complete weather report as CSV or JSON
     """
     # Get all data
-    historical_end = datetime.date.today()
-    historical_start = historical_end.replace(year=historical_end.year - 20)
+    historical_start, historical_end = history_window(20)
     
     cfg = EXTREME_WEATHER_THRESHOLDS[condition_type]
     parameter = cfg["parameter"]
     
-    nasa_data = get_nasa_power_data(lat, lon, historical_start, historical_end, [parameter])
+    nasa_data = await get_series(lat, lon, historical_start, historical_end, [parameter])
     
-    if not nasa_data:
+    if not nasa_data or parameter not in nasa_data:
         raise HTTPException(status_code=500, detail="Failed to fetch data")
     
-    param_data = nasa_data["properties"]["parameter"][parameter]
-    
-    if month:
-        param_data = filter_data_by_month(param_data, month)
+    series = nasa_data[parameter]
     
     if format == "csv":
-        output = io.StringIO()
-        writer = csv.writer(output)
-        writer.writerow(["Date", "Value", "Parameter", "Unit", "Location_Lat", "Location_Lon"])
+        keep = month_mask(series, month) if month else series.valid_mask
         
-        for date_str, value in param_data.items():
-            if value not in (-999, None):
-                writer.writerow([date_str, value, parameter, cfg["unit"], lat, lon])
+        def csv_rows():
+            # Rows are formatted chunk by chunk straight from the series arrays, so
+            # headers go out immediately and memory stays flat; missing days are skipped
+            yield "Date,Value,Parameter,Unit,Location_Lat,Location_Lon\r\n"
+            suffix = f",{parameter},{cfg['unit']},{lat},{lon}\r\n"
+            for start in range(0, keep.size, CSV_CHUNK_ROWS):
+                rows = start + np.flatnonzero(keep[start:start + CSV_CHUNK_ROWS])
+                if rows.size:
+                    dates = series.dates[rows].tolist()
+                    values = series.published_values(rows).tolist()
+                    yield "".join(f"{d},{v}{suffix}" for d, v in zip(dates, values))
         
-        output.seek(0)
         return StreamingResponse(
-            iter([output.getvalue()]),
+            csv_rows(),
             media_type="text/csv",
             headers={"Content-Disposition": f"attachment; filename=weather_report_{condition_type}_{lat}_{lon}.csv"}
         )
     else:
-        return {
+        # Back to {YYYYMMDD: value}; missing days keep the -999.0 sentinel POWER sends
+        selected = series.months == month if month else slice(None)
+        param_data = {
+            str(d): float(MISSING_VALUE) if v != v else v
+            for d, v in zip(series.dates[selected].tolist(), series.published_values(selected).tolist())
+        }
+        return ORJSONResponse({
             "metadata": {"lat": lat, "lon": lon, "condition": condition_type, "parameter": parameter},
             "data": param_data
-        }
+        })
+
+async def _load_filtered_series(lat, lon, parameter, month=None, season=None, doy=None, start_year=None, end_year=None):
+    """
+    20-year ParsedSeries for one parameter plus the mask for the requested time filter
+    """
+    start_date, end_date = history_window(20)
+
+    nasa = await get_series(lat, lon, start_date, end_date, [parameter])
+    if not nasa:
+        raise HTTPException(status_code=500, detail="NASA POWER fetch failed")
+
+    if parameter not in nasa:
+        raise HTTPException(status_code=404, detail=f"Parameter {parameter} not found")
+
+    series = nasa[parameter]
+    mask = select_mask(series, month=month, season=season, doy=doy, start_year=start_year, end_year=end_year)
+    return series, mask
+
+def _extreme_analysis(series, mask, threshold, cond):
+    """
+    Probability, statistics, distribution and trend computed from one filtered series
+    """
+    prob = calculate_probability(series.values, mask, threshold, cond)
+    stats = calculate_extreme_statistics(series.values, mask)
+
+    summary = None
+    if prob is not None and stats:
+        summary = "High likelihood; plan accordingly" if prob >= 0.6 else ("Moderate likelihood; monitor conditions" if prob >= 0.3 else "Low likelihood")
+
+    return {
+        "probability": prob if prob is not None else 0.0,
+        "statistics": stats,
+        "distribution": summarize_values(series.values[mask]),
+        "trend": analyze_trend_yearly_extremes(series, mask, threshold, cond),
+        "summary": summary,
+    }
+
+EXTREME_METADATA = {
+    "source": "NASA POWER Daily API",
+    "spatial_resolution": "0.5° x 0.625° grid",
+    "temporal_coverage": "1981‑present (varies by var)"
+}
+
+def _check_fixed_bins(bins, parameter):
+    # Reject bins="fixed" up front rather than reporting edges that were not used
+    if bins == "fixed" and not has_fixed_edges(parameter):
+        raise HTTPException(status_code=422, detail=f'No fixed histogram edges for {parameter}; pass a bin count instead of "fixed"')
 
 @router.get("/extreme-weather/probability", tags=["Extreme Weather Probability"])
 async def get_extreme_weather_probability(
     lat: float = Query(..., ge=-90, le=90, description="Latitude"),
     lon: float = Query(..., ge=-180, le=180, description="Longitude"),
     month: Optional[int] = Query(None, ge=1, le=12, description="Month (1-12)"),
-    season: Optional[str] = Query(None, regex="^(djf|mam|jja|son)$", description="Season code"),
+    season: Optional[Literal["djf", "mam", "jja", "son"]] = Query(None, description="Season code"),
     doy: Optional[int] = Query(None, ge=1, le=366, description="Day of year 1-366"),
     start_year: Optional[int] = Query(None, description="Start year inclusive"),
     end_year: Optional[int] = Query(None, description="End year inclusive"),
@@ -81,35 +143,52 @@ async def get_extreme_weather_probability(
     cfg = EXTREME_WEATHER_THRESHOLDS[condition_type]
     parameter, cond, default_threshold = cfg["parameter"], cfg["condition"], custom_threshold or cfg["default_threshold"]
 
-    end_date = datetime.date.today()
-    start_date = end_date.replace(year=end_date.year - 20)
+    series, mask = await _load_filtered_series(lat, lon, parameter, month, season, doy, start_year, end_year)
+    analysis = _extreme_analysis(series, mask, default_threshold, cond)
 
-    nasa = get_nasa_power_data(lat, lon, start_date, end_date, [parameter])
-    if not nasa:
-        raise HTTPException(status_code=500, detail="NASA POWER fetch failed")
+    return {
+        "location": {"latitude": lat, "longitude": lon},
+        "time_filter": {"month": month, "season": season, "doy": doy, "start_year": start_year, "end_year": end_year},
+        "condition_type": condition_type,
+        "parameter": parameter,
+        "condition": cond,
+        "threshold": default_threshold,
+        "probability": analysis["probability"],
+        "statistics": analysis["statistics"],
+        "distribution": analysis["distribution"],
+        "trend": analysis["trend"],
+        "summary": analysis["summary"],
+        "metadata": EXTREME_METADATA
+    }
 
-    try:
-        p = nasa["properties"]["parameter"][parameter]
-    except KeyError:
-        raise HTTPException(status_code=404, detail=f"Parameter {parameter} not found")
+@router.get("/extreme-weather/analysis", tags=["Extreme Weather Probability"])
+async def get_extreme_weather_analysis(
+    lat: float = Query(..., ge=-90, le=90, description="Latitude"),
+    lon: float = Query(..., ge=-180, le=180, description="Longitude"),
+    month: Optional[int] = Query(None, ge=1, le=12, description="Month (1-12)"),
+    season: Optional[Literal["djf", "mam", "jja", "son"]] = Query(None, description="Season code"),
+    doy: Optional[int] = Query(None, ge=1, le=366, description="Day of year 1-366"),
+    start_year: Optional[int] = Query(None, description="Start year inclusive"),
+    end_year: Optional[int] = Query(None, description="End year inclusive"),
+    condition_type: str = Query(..., description="heatwave, cold_wave, heavy_rain, high_wind, heavy_snow, high_cloud_cover"),
+    custom_threshold: Optional[float] = Query(None, description="Override default threshold"),
+    bins: Union[Annotated[int, Field(ge=4, le=200)], Literal["fixed"]] = Query(
+        24, description='Histogram bin count, or "fixed" for static per-parameter edges'
+    )
+):
+    """
+    Probability, statistics, histogram and trend for one condition in a single call
+    """
+    if condition_type not in EXTREME_WEATHER_THRESHOLDS:
+        raise HTTPException(status_code=400, detail=f"Invalid condition_type: {condition_type}")
 
-    data = p
-    data = filter_by_year_range(data, start_year, end_year)
-    if doy:
-        data = filter_by_doy(data, doy)
-    elif season:
-        data = filter_by_season(data, season)
-    elif month:
-        data = filter_data_by_month(data, month)
+    cfg = EXTREME_WEATHER_THRESHOLDS[condition_type]
+    parameter, cond, threshold = cfg["parameter"], cfg["condition"], custom_threshold or cfg["default_threshold"]
+    _check_fixed_bins(bins, parameter)
 
-    prob = calculate_probability(data, default_threshold, cond)
-    stats = calculate_extreme_statistics(data)
-    values = [v for v in data.values() if v is not None and v != -999]
-
-    trend = analyze_trend_yearly_extremes(data, default_threshold, cond)
-    summary = None
-    if prob is not None and stats:
-        summary = "High likelihood; plan accordingly" if prob >= 0.6 else ("Moderate likelihood; monitor conditions" if prob >= 0.3 else "Low likelihood")
+    series, mask = await _load_filtered_series(lat, lon, parameter, month, season, doy, start_year, end_year)
+    analysis = _extreme_analysis(series, mask, threshold, cond)
+    hist = make_histogram(series.values[mask], bins=bins, parameter=parameter)
 
     return {
         "location": {"latitude": lat, "longitude": lon},
@@ -117,23 +196,18 @@ async def get_extreme_weather_probability(
         "condition_type": condition_type,
         "parameter": parameter,
         "condition": cond,
-        "threshold": default_threshold,
-        "probability": prob if prob is not None else 0.0,
-        "statistics": stats,
-        "distribution": summarize_values(values),
-        "trend": trend,
-        "summary": summary,
-        "metadata": {
-            "source": "NASA POWER Daily API",
-            "spatial_resolution": "~0.5° grid",
-            "temporal_coverage": "1981‑present (varies by var)"
-        }
+        "threshold": threshold,
+        **analysis,
+        "histogram": hist,
+        # Every condition defined on the same parameter, at its default threshold
+        "related_conditions": evaluate_all(parameter, series.values[mask]),
+        "metadata": {**EXTREME_METADATA, "bins": bins}
     }
 @router.get("/activity-forecast", tags=["Activity Planning"])
 async def get_activity_forecast(
     lat: float = Query(..., description="Latitude"),
     lon: float = Query(..., description="Longitude"),
-    activity: str = Query(..., regex="^(beach|hiking|skiing|cycling|camping)$"),
+    activity: Literal["beach", "hiking", "skiing", "cycling", "camping"] = Query(...),
     month: Optional[int] = Query(None, ge=1, le=12),
     date: Optional[str] = Query(None, description="Specific date YYYY-MM-DD")
 ):
@@ -141,14 +215,12 @@ async def get_activity_forecast(
     Get weather suitability score for specific activity
     """
     from services.activity_presets import get_activity_suitability, ACTIVITY_PRESETS
-    from datetime import date as dt, timedelta
     
     # Get weather data for the period
-    end_date = dt.today()
-    start_date = end_date.replace(year=end_date.year - 10)
+    start_date, end_date = history_window(10)
     
     params = ["T2M", "PRECTOTCORR", "WS10M", "RH2M", "CLOUD_AMT", "SNODP"]
-    nasa_data = get_nasa_power_data(lat, lon, start_date, end_date, params)
+    nasa_data = await get_series(lat, lon, start_date, end_date, params)
     
     if not nasa_data:
         raise HTTPException(status_code=500, detail="Failed to fetch weather data")
@@ -156,12 +228,11 @@ async def get_activity_forecast(
     # Calculate average conditions for the month/date
     averages = {}
     for param in params:
-        if param in nasa_data["properties"]["parameter"]:
-            data = nasa_data["properties"]["parameter"][param]
-            if month:
-                data = filter_data_by_month(data, month)
-            values = [v for v in data.values() if v not in (-999, None)]
-            averages[param] = sum(values) / len(values) if values else 0
+        if param in nasa_data:
+            series = nasa_data[param]
+            mask = month_mask(series, month) if month else series.valid_mask
+            values = series.values[mask]
+            averages[param] = float(values.mean(dtype=np.float64)) if values.size else 0
     
     suitability = get_activity_suitability(activity, averages)
     
@@ -184,11 +255,9 @@ async def get_multi_day_probability(
     """
     Get probability for multi-day event (e.g., 3-day festival, week-long trek)
     """
-    from datetime import datetime
-    
     try:
-        start_dt = datetime.strptime(start_date, "%Y-%m-%d")
-        end_dt = datetime.strptime(end_date, "%Y-%m-%d")
+        start_dt = datetime.date.fromisoformat(start_date)
+        end_dt = datetime.date.fromisoformat(end_date)
     except ValueError:
         raise HTTPException(status_code=400, detail="Invalid date format. Use YYYY-MM-DD")
     
@@ -196,51 +265,43 @@ async def get_multi_day_probability(
         raise HTTPException(status_code=400, detail="Maximum 30-day range allowed")
     
     # Get historical data for same calendar period across multiple years
-    historical_end = datetime.date.today()
-    historical_start = historical_end.replace(year=historical_end.year - 20)
+    historical_start, historical_end = history_window(20)
     
     cfg = EXTREME_WEATHER_THRESHOLDS[condition_type]
     parameter = cfg["parameter"]
     threshold = cfg["default_threshold"]
     condition = cfg["condition"]
     
-    nasa_data = get_nasa_power_data(lat, lon, historical_start, historical_end, [parameter])
+    nasa_data = await get_series(lat, lon, historical_start, historical_end, [parameter])
     
     if not nasa_data:
         raise HTTPException(status_code=500, detail="Failed to fetch NASA data")
     
-    param_data = nasa_data["properties"]["parameter"][parameter]
+    series = nasa_data[parameter]
     
     # Filter to same day-of-year range across all years
     start_doy = start_dt.timetuple().tm_yday
     end_doy = end_dt.timetuple().tm_yday
     
-    multi_day_events = []
-    years_analyzed = set()
-    
-    for date_str, value in param_data.items():
-        try:
-            dt_obj = datetime.strptime(date_str, "%Y%m%d")
-            doy = dt_obj.timetuple().tm_yday
-            
-            if start_doy <= doy <= end_doy:
-                years_analyzed.add(dt_obj.year)
-                if value not in (-999, None):
-                    meets_condition = (value > threshold) if condition == "above" else (value < threshold)
-                    multi_day_events.append({
-                        "year": dt_obj.year,
-                        "date": date_str,
-                        "value": value,
-                        "exceeds_threshold": meets_condition
-                    })
-        except:
-            continue
+    in_window = (series.doys >= start_doy) & (series.doys <= end_doy)
+    valid = in_window & series.valid_mask
+    exceeds = COMPARE[condition](series.values, threshold)
     
     # Calculate probability of at least one day meeting condition during the period
-    years_with_event = len(set(e["year"] for e in multi_day_events if e["exceeds_threshold"]))
-    total_years = len(years_analyzed)
+    years_with_event = int(np.unique(series.years[valid & exceeds]).size)
+    total_years = int(np.unique(series.years[in_window]).size)
     probability = years_with_event / total_years if total_years > 0 else 0
     
+    multi_day_events = [
+        {
+            "year": int(series.years[i]),
+            "date": str(series.dates[i]),
+            "value": round(float(series.values[i]), 2),
+            "exceeds_threshold": bool(exceeds[i])
+        }
+        for i in np.flatnonzero(valid)[:50]  # Limit response size
+    ]
+    
     return {
         "location": {"latitude": lat, "longitude": lon},
         "date_range": {"start": start_date, "end": end_date, "days": (end_dt - start_dt).days + 1},
@@ -249,9 +310,51 @@ async def get_multi_day_probability(
         "years_analyzed": total_years,
         "years_with_event": years_with_event,
         "summary": f"{'High' if probability > 0.5 else 'Moderate' if probability > 0.3 else 'Low'} risk",
-        "events": multi_day_events[:50],  # Limit response size
+        "events": multi_day_events,
         "data_source": "NASA POWER Daily API"
     }
+MONTH_NAMES = ["", "Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec"]
+
+# Heatmaps only change when the 20-year window rolls over (monthly); keep them a day
+_heatmap_cache = TTLCache(maxsize=4096, ttl=86400)
+
+def _compute_heatmap(series, condition_type):
+    cfg = EXTREME_WEATHER_THRESHOLDS[condition_type]
+    threshold = cfg["default_threshold"]
+    condition = cfg["condition"]
+    
+    # Calculate probability for each month in one pass: per-month counts of
+    # valid days and of days meeting the condition (index 0 is unused)
+    valid = series.valid_mask
+    exceeds = COMPARE[condition](series.values, threshold)
+    valid_days = np.bincount(series.months[valid], minlength=13)
+    event_days = np.bincount(series.months[valid & exceeds], minlength=13)
+    monthly_probabilities = {
+        month: round(float(event_days[month] / valid_days[month]), 3) if valid_days[month] else 0
+        for month in range(1, 13)
+    }
+    
+    # Find best and worst months. Order is (probability, month), so ties resolve
+    # by calendar month; probabilities have 3 decimals, making the key exact.
+    months = np.arange(1, 13)
+    probs = np.array([monthly_probabilities[m] for m in months])
+    order_key = np.rint(probs * 1000).astype(np.int64) * 16 + months
+    best_idx = np.argpartition(order_key, 3)[:3]
+    best_idx = best_idx[np.argsort(order_key[best_idx])]  # Lowest probability
+    worst_idx = np.argpartition(order_key, -3)[-3:]
+    worst_idx = worst_idx[np.argsort(order_key[worst_idx])]  # Highest probability
+    best_months = [(int(months[i]), monthly_probabilities[months[i]]) for i in best_idx]
+    worst_months = [(int(months[i]), monthly_probabilities[months[i]]) for i in worst_idx]
+    
+    return {
+        "condition_type": condition_type,
+        "heatmap_data": monthly_probabilities,
+        "best_months": [{"month": m, "name": MONTH_NAMES[m], "probability": p} for m, p in best_months],
+        "worst_months": [{"month": m, "name": MONTH_NAMES[m], "probability": p} for m, p in worst_months],
+        "recommendation": f"Best time to avoid {condition_type}: {', '.join([MONTH_NAMES[m] for m, _ in best_months])}",
+        "data_source": "NASA POWER (20-year analysis)"
+    }
+
 @router.get("/seasonal-heatmap", tags=["Visualization Data"])
 async def get_seasonal_heatmap(
     lat: float = Query(..., description="Latitude"),
@@ -262,44 +365,21 @@ async def get_seasonal_heatmap(
     Get probability matrix for all 12 months to create heatmap visualization
     Shows best/worst months for planning
     """
-    historical_end = datetime.date.today()
-    historical_start = historical_end.replace(year=historical_end.year - 20)
+    historical_start, historical_end = history_window(20)
     
-    cfg = EXTREME_WEATHER_THRESHOLDS[condition_type]
-    parameter = cfg["parameter"]
-    threshold = cfg["default_threshold"]
-    condition = cfg["condition"]
-    
-    nasa_data = get_nasa_power_data(lat, lon, historical_start, historical_end, [parameter])
-    
-    if not nasa_data:
-        raise HTTPException(status_code=500, detail="Failed to fetch NASA data")
-    
-    param_data = nasa_data["properties"]["parameter"][parameter]
-    
-    # Calculate probability for each month
-    monthly_probabilities = {}
-    for month in range(1, 13):
-        filtered = filter_data_by_month(param_data, month)
-        prob = calculate_probability(filtered, threshold, condition)
-        monthly_probabilities[month] = round(prob, 3) if prob is not None else 0
-    
-    # Find best and worst months
-    sorted_months = sorted(monthly_probabilities.items(), key=lambda x: x[1])
-    best_months = sorted_months[:3]  # Lowest probability
-    worst_months = sorted_months[-3:]  # Highest probability
-    
-    month_names = ["", "Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec"]
+    key = (round(lat, 2), round(lon, 2), condition_type, historical_end.isoformat())
+    heatmap = _heatmap_cache.get(key)
+    if heatmap is None:
+        parameter = EXTREME_WEATHER_THRESHOLDS[condition_type]["parameter"]
+        nasa_data = await get_series(lat, lon, historical_start, historical_end, [parameter])
+        
+        if not nasa_data:
+            raise HTTPException(status_code=500, detail="Failed to fetch NASA data")
+        
+        heatmap = _heatmap_cache[key] = _compute_heatmap(nasa_data[parameter], condition_type)
     
-    return {
-        "location": {"latitude": lat, "longitude": lon},
-        "condition_type": condition_type,
-        "heatmap_data": monthly_probabilities,
-        "best_months": [{"month": m, "name": month_names[m], "probability": p} for m, p in best_months],
-        "worst_months": [{"month": m, "name": month_names[m], "probability": p} for m, p in worst_months],
-        "recommendation": f"Best time to avoid {condition_type}: {', '.join([month_names[m] for m, _ in best_months])}",
-        "data_source": "NASA POWER (20-year analysis)"
-    }
+    # Cached per rounded location; echo the caller's own coordinates
+    return {"location": {"latitude": lat, "longitude": lon}, **heatmap}
 
 
 
@@ -310,45 +390,35 @@ async def region_probability(req: RegionRequest = Body(...)):
     parameter, cond, threshold = cfg["parameter"], cfg["condition"], req.custom_threshold or cfg["default_threshold"]
 
     # Build sampling list
-    points: List[Tuple[float, float]] = []
-    if req.points:
-        points.extend([(p.lat, p.lon) for p in req.points])
-    if req.polygon:
-        poly = [(c.lat, c.lon) for c in req.polygon]
-        sampled = sample_polygon_to_grid(poly, step=0.5)
-        if not sampled:  # fallback to polygon centroid
-            centroid = tuple(np.mean(np.array(poly), axis=0).tolist())
-            sampled = [centroid]
-        points.extend(sampled)
+    points = sample_area(req.points, req.polygon, step=0.5)
     if not points:
         raise HTTPException(status_code=400, detail="Provide points or polygon")
+    if len(points) > MAX_AREA_SAMPLES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Area too large: {len(points)} sample points (max {MAX_AREA_SAMPLES}); use a smaller polygon"
+        )
+
+    start_date, end_date = history_window(20)
 
-    end_date = datetime.date.today()
-    start_date = end_date.replace(year=end_date.year - 20)
+    # Grid points are fetched concurrently instead of one blocking call per point
+    point_series = await get_cached_series_for_points(points, start_date, end_date, [parameter])
 
     probs, counts, agg_vals = [], [], []
-    for lat, lon in points:
-        nasa = get_nasa_power_data(lat, lon, start_date, end_date, [parameter])
-        if not nasa:
+    for nasa in point_series:
+        if not nasa or parameter not in nasa:
             continue
-        try:
-            p = nasa["properties"]["parameter"][parameter]
-        except KeyError:
-            continue
-        data = p
-        data = filter_by_year_range(data, req.start_year, req.end_year)
-        if req.doy:
-            data = filter_by_doy(data, req.doy)
-        elif req.season:
-            data = filter_by_season(data, req.season)
-        elif req.month:
-            data = filter_data_by_month(data, req.month)
-        pr = calculate_probability(data, threshold, cond)
+        series = nasa[parameter]
+        mask = select_mask(
+            series, month=req.month, season=req.season, doy=req.doy,
+            start_year=req.start_year, end_year=req.end_year
+        )
+        pr = calculate_probability(series.values, mask, threshold, cond)
         if pr is not None:
             probs.append(pr)
-        vs = [v for v in data.values() if v is not None and v != -999]
-        agg_vals.extend(vs)
-        counts.append(len(vs))
+        vs = series.values[mask]
+        agg_vals.append(vs)
+        counts.append(vs.size)
 
     if not probs:
         raise HTTPException(status_code=404, detail="No valid samples inside region")
@@ -363,35 +433,19 @@ async def region_probability(req: RegionRequest = Body(...)):
         "probability": region_prob,
         "region_stats": {
             "mean_point_days": int(np.mean(counts)) if counts else 0,
-            "value_summary": summarize_values(agg_vals)
+            "value_summary": summarize_values(np.concatenate(agg_vals))
         }
     }
 
 @router.post("/extreme-weather/histogram", tags=["Charts & Distributions"])
 async def histogram(req: HistogramRequest):
-    end_date = datetime.date.today()
-    start_date = end_date.replace(year=end_date.year - 20)
-
-    nasa = get_nasa_power_data(req.lat, req.lon, start_date, end_date, [req.parameter])
-    if not nasa:
-        raise HTTPException(status_code=500, detail="NASA POWER fetch failed")
-
-    try:
-        p = nasa["properties"]["parameter"][req.parameter]
-    except KeyError:
-        raise HTTPException(status_code=404, detail=f"Parameter {req.parameter} not found")
-
-    data = p
-    data = filter_by_year_range(data, req.start_year, req.end_year)
-    if req.doy:
-        data = filter_by_doy(data, req.doy)
-    elif req.season:
-        data = filter_by_season(data, req.season)
-    elif req.month:
-        data = filter_data_by_month(data, req.month)
-
-    values = [v for v in data.values() if v is not None and v != -999]
-    hist = make_histogram(values, bins=req.bins)
+    _check_fixed_bins(req.bins, req.parameter)
+    series, mask = await _load_filtered_series(
+        req.lat, req.lon, req.parameter, month=req.month, season=req.season, doy=req.doy,
+        start_year=req.start_year, end_year=req.end_year
+    )
+    values = series.values[mask]
+    hist = make_histogram(values, bins=req.bins, parameter=req.parameter)
     return {
         "histogram": hist,
         "summary": summarize_values(values),
@@ -5,10 +5,18 @@ Based on mentor feedback: User inputs location + date/time, gets W/P/T/H probabi
 No threshold input needed - system uses predefined values
 """
 
-from fastapi import APIRouter, HTTPException, Query
+from fastapi import APIRouter, HTTPException, Query, Request, Body
+from fastapi.responses import ORJSONResponse, Response
 from datetime import datetime
-from services.nasa_power import get_nasa_power_data
-import statistics
+from cachetools import TTLCache
+from middleware import etag_matches
+from services.nasa_cache import get_cached_series_for_points
+from services.nasa_client import get_series
+from utils.calculations import sample_area, probs_above_many, probs_below_many
+from utils.parsed_series import ParsedSeries
+from models import MAX_AREA_SAMPLES, AreaForecastRequest
+import hashlib
+import numpy as np
 from typing import Dict, List
 
 router = APIRouter(prefix="/api/simple-forecast", tags=["Simple Forecast"])
@@ -24,37 +32,61 @@ THRESHOLDS = {
     "very_hot": 40.0       # °C - extreme heat
 }
 
+FORECAST_PARAMETERS = ["T2M_MAX", "T2M_MIN", "PRECTOTCORR", "WS10M", "RH2M"]
 
-def filter_by_date(data: dict, target_month: int, target_day: int) -> List[float]:
-    """Extract values for specific month/day across all years"""
-    values = []
-    for date_str, value in data.items():
-        if value == -999:  # Skip missing data
-            continue
-        try:
-            date_obj = datetime.strptime(date_str, "%Y%m%d")
-            if date_obj.month == target_month and date_obj.day == target_day:
-                values.append(value)
-        except:
-            continue
-    return values
+# The forecast is a pure function of (lat, lon, date, time): cache it for a day,
+# here and in browsers/CDNs
+CACHE_CONTROL = "public, max-age=86400"
+_response_cache = TTLCache(maxsize=4096, ttl=86400)  # key -> serialized JSON body
 
 
-def calculate_probability(values: List[float], threshold: float, condition: str = "above") -> float:
+def forecast_etag(lat: float, lon: float, date: str, time: str) -> str:
+    """ETag derived from the request alone, so it is known before any NASA fetch"""
+    digest = hashlib.blake2b(f"{lat:.4f}|{lon:.4f}|{date}|{time}".encode(), digest_size=16).hexdigest()
+    return f'W/"{digest}"'
+
+
+def date_mask(series: ParsedSeries, target_month: int, target_day: int) -> np.ndarray:
+    """Boolean mask selecting a specific month/day across all years"""
+    return (series.months == target_month) & (series.dates % 100 == target_day)
+
+
+def filter_by_date(params: Dict[str, ParsedSeries], parameter: str, target_month: int, target_day: int) -> np.ndarray:
+    """Extract one parameter's values for a specific month/day across all years (missing data skipped), as published"""
+    if parameter not in params:
+        return np.empty(0)
+    # Masked per series: parameters are cached separately, so their date axes need not match
+    series = params[parameter]
+    return series.published_values(date_mask(series, target_month, target_day) & series.valid_mask)
+
+
+def published_mean(values: np.ndarray) -> float:
+    """Mean of 2-decimal values summed in exact hundredths, so rounding it matches the exact (statistics.mean) result"""
+    return int(np.rint(values * 100).sum()) / (100 * values.size)
+
+
+def calculate_probability(values: np.ndarray, threshold: float, condition: str = "above") -> float:
     """Calculate probability of threshold exceedance"""
-    if not values:
+    if not len(values):
         return 0.0
     
     if condition == "above":
-        count = sum(1 for v in values if v > threshold)
+        count = int(np.count_nonzero(values > threshold))
     else:
-        count = sum(1 for v in values if v < threshold)
+        count = int(np.count_nonzero(values < threshold))
     
     return round(count / len(values) * 100, 1)  # Return as percentage
 
 
+def calculate_probabilities(values: np.ndarray, thresholds: List[float], condition: str = "above") -> List[float]:
+    """calculate_probability for several thresholds from a single sort"""
+    probs = probs_above_many(values, thresholds) if condition == "above" else probs_below_many(values, thresholds)
+    return [round(p * 100, 1) for p in probs.tolist()]  # Return as percentages
+
+
 @router.get("/")
 async def get_simple_forecast(
+    request: Request,
     lat: float = Query(..., ge=-90, le=90, description="Latitude"),
     lon: float = Query(..., ge=-180, le=180, description="Longitude"),
     date: str = Query(..., description="Date in YYYY-MM-DD format"),
@@ -78,6 +110,17 @@ async def get_simple_forecast(
             detail="Invalid date/time format. Use YYYY-MM-DD and HH:MM"
         )
     
+    headers = {"ETag": forecast_etag(lat, lon, date, time), "Cache-Control": CACHE_CONTROL}
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and etag_matches(if_none_match, headers["ETag"]):
+        return Response(status_code=304, headers=headers)
+    
+    cache_key = (lat, lon, date, time)
+    cached = _response_cache.get(cache_key)
+    if cached is not None:
+        # Already-encoded orjson bytes: no re-serialization on a hit
+        return Response(content=cached, media_type="application/json", headers=headers)
+    
     # Prepare date range for NASA API (same date across past 20 years)
     start_year = target_datetime.year - 20
     end_year = target_datetime.year - 1
@@ -86,47 +129,43 @@ async def get_simple_forecast(
     end_date = datetime(end_year, target_datetime.month, target_datetime.day)
     
     # Fetch NASA POWER data
-    parameters = ["T2M_MAX", "T2M_MIN", "PRECTOTCORR", "WS10M", "RH2M"]
-    
     try:
-        nasa_data = get_nasa_power_data(
+        params = await get_series(
             lat=lat,
             lon=lon,
             start_date=start_date,
             end_date=end_date,
-            parameters=parameters
+            parameters=FORECAST_PARAMETERS
         )
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"NASA API Error: {str(e)}")
     
-    if not nasa_data:
+    if not params:
         raise HTTPException(status_code=500, detail="Failed to fetch NASA data")
     
-    # Extract parameter data
-    params = nasa_data.get("properties", {}).get("parameter", {})
-    
-    # Filter data for target date
-    temp_max_data = filter_by_date(params.get("T2M_MAX", {}), target_datetime.month, target_datetime.day)
-    temp_min_data = filter_by_date(params.get("T2M_MIN", {}), target_datetime.month, target_datetime.day)
-    precip_data = filter_by_date(params.get("PRECTOTCORR", {}), target_datetime.month, target_datetime.day)
-    wind_data = filter_by_date(params.get("WS10M", {}), target_datetime.month, target_datetime.day)
-    humidity_data = filter_by_date(params.get("RH2M", {}), target_datetime.month, target_datetime.day)
+    # Filter data for target date (cached, already-parsed series)
+    month, day = target_datetime.month, target_datetime.day
+    temp_max_data = filter_by_date(params, "T2M_MAX", month, day)
+    temp_min_data = filter_by_date(params, "T2M_MIN", month, day)
+    precip_data = filter_by_date(params, "PRECTOTCORR", month, day)
+    wind_data = filter_by_date(params, "WS10M", month, day)
+    humidity_data = filter_by_date(params, "RH2M", month, day)
     
     # Calculate statistics
-    temp_max = round(max(temp_max_data), 1) if temp_max_data else None
-    temp_min = round(min(temp_min_data), 1) if temp_min_data else None
-    avg_temp_max = round(statistics.mean(temp_max_data), 1) if temp_max_data else None
+    temp_max = avg_temp_max = None
+    if temp_max_data.size:
+        temp_max = round(float(temp_max_data.max()), 1)
+        avg_temp_max = round(published_mean(temp_max_data), 1)
+    temp_min = round(float(temp_min_data.min()), 1) if temp_min_data.size else None
     
-    # Calculate probabilities (W, P, T, H)
-    rain_prob = calculate_probability(precip_data, THRESHOLDS["rain"], "above")
-    heavy_rain_prob = calculate_probability(precip_data, THRESHOLDS["heavy_rain"], "above")
+    # Calculate probabilities (W, P, T, H); paired thresholds share one sort
+    hot_prob, very_hot_prob = calculate_probabilities(temp_max_data, [THRESHOLDS["hot"], THRESHOLDS["very_hot"]])
+    rain_prob, heavy_rain_prob = calculate_probabilities(precip_data, [THRESHOLDS["rain"], THRESHOLDS["heavy_rain"]])
     wind_prob = calculate_probability(wind_data, THRESHOLDS["high_wind"], "above")
-    hot_prob = calculate_probability(temp_max_data, THRESHOLDS["hot"], "above")
-    very_hot_prob = calculate_probability(temp_max_data, THRESHOLDS["very_hot"], "above")
     high_humidity_prob = calculate_probability(humidity_data, THRESHOLDS["high_humidity"], "above")
     
-    avg_humidity = round(statistics.mean(humidity_data), 1) if humidity_data else None
-    avg_wind = round(statistics.mean(wind_data), 1) if wind_data else None
+    avg_humidity = round(published_mean(humidity_data), 1) if humidity_data.size else None
+    avg_wind = round(published_mean(wind_data), 1) if wind_data.size else None
     
     # Generate summary text
     location_str = f"({lat}, {lon})"
@@ -158,7 +197,7 @@ async def get_simple_forecast(
     summary = f"Weather forecast for {location_str} on {date_str} at {time_str}: " + ", ".join(summary_parts) + "."
     
     # Return response
-    return {
+    result = {
         "location": {
             "latitude": lat,
             "longitude": lon
@@ -201,3 +240,78 @@ async def get_simple_forecast(
         "data_points_analyzed": len(temp_max_data),
         "years_analyzed": f"{start_year}-{end_year}"
     }
+    response = ORJSONResponse(result, headers=headers)
+    _response_cache[cache_key] = response.body
+    return response
+
+
+def point_probabilities(params: Dict[str, ParsedSeries], target_month: int, target_day: int) -> Dict[str, float]:
+    """W, P, T, H exceedance probabilities (%) for one location"""
+    temp_max_data = filter_by_date(params, "T2M_MAX", target_month, target_day)
+    precip_data = filter_by_date(params, "PRECTOTCORR", target_month, target_day)
+    wind_data = filter_by_date(params, "WS10M", target_month, target_day)
+    humidity_data = filter_by_date(params, "RH2M", target_month, target_day)
+    hot_prob, very_hot_prob = calculate_probabilities(temp_max_data, [THRESHOLDS["hot"], THRESHOLDS["very_hot"]])
+    rain_prob, heavy_rain_prob = calculate_probabilities(precip_data, [THRESHOLDS["rain"], THRESHOLDS["heavy_rain"]])
+    return {
+        "hot_probability": hot_prob,
+        "very_hot_probability": very_hot_prob,
+        "rain_probability": rain_prob,
+        "heavy_rain_probability": heavy_rain_prob,
+        "high_wind_probability": calculate_probability(wind_data, THRESHOLDS["high_wind"], "above"),
+        "high_humidity_probability": calculate_probability(humidity_data, THRESHOLDS["high_humidity"], "above"),
+    }
+
+
+@router.post("/area")
+async def get_area_forecast(req: AreaForecastRequest = Body(...)):
+    """
+    Simple forecast averaged over an area
+    
+    User inputs: points and/or polygon + Date + Time
+    Polygons are sampled on the ~0.5° NASA POWER grid; all locations are fetched concurrently
+    """
+    try:
+        target_datetime = datetime.strptime(f"{req.date} {req.time}", "%Y-%m-%d %H:%M")
+    except ValueError:
+        raise HTTPException(
+            status_code=400, 
+            detail="Invalid date/time format. Use YYYY-MM-DD and HH:MM"
+        )
+    
+    points = sample_area(req.points, req.polygon, step=0.5)
+    if not points:
+        raise HTTPException(status_code=400, detail="Provide points or polygon")
+    if len(points) > MAX_AREA_SAMPLES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Area too large: {len(points)} sample points (max {MAX_AREA_SAMPLES}); use a smaller polygon"
+        )
+    
+    start_year = target_datetime.year - 20
+    end_year = target_datetime.year - 1
+    start_date = datetime(start_year, target_datetime.month, target_datetime.day)
+    end_date = datetime(end_year, target_datetime.month, target_datetime.day)
+    
+    point_series = await get_cached_series_for_points(points, start_date, end_date, FORECAST_PARAMETERS)
+    
+    per_point = [
+        point_probabilities(params, target_datetime.month, target_datetime.day)
+        for params in point_series if params
+    ]
+    if not per_point:
+        raise HTTPException(status_code=404, detail="No valid samples inside area")
+    
+    probabilities = {
+        key: round(float(np.mean([p[key] for p in per_point])), 1)
+        for key in per_point[0]
+    }
+    
+    return {
+        "area": {"points_used": len(per_point), "total_samples": len(points)},
+        "date": req.date,
+        "time": req.time,
+        "probabilities": probabilities,
+        "unit": "%",
+        "years_analyzed": f"{start_year}-{end_year}"
+    }
@@ -3,6 +3,8 @@
 Activity-specific weather condition presets for user-friendly planning
 """
 
+import numpy as np
+
 ACTIVITY_PRESETS = {
     "beach": {
         "name": "Beach Mode",
@@ -59,6 +61,48 @@ ACTIVITY_PRESETS = {
     }
 }
 
+def _compile_preset(preset: dict) -> dict:
+    ideal = preset["ideal_conditions"]
+    return {
+        "names": tuple(ideal),
+        "params": tuple(rules["parameter"] for rules in ideal.values()),
+        "mins": np.array([rules.get("min", -np.inf) for rules in ideal.values()], dtype=float),
+        "maxs": np.array([rules.get("max", np.inf) for rules in ideal.values()], dtype=float),
+    }
+
+# Presets as parallel arrays (one entry per ideal condition, in preset order), built once
+_PRESET_TABLES = {name: _compile_preset(preset) for name, preset in ACTIVITY_PRESETS.items()}
+
+def _violations(activity: str, values_matrix, columns):
+    """
+    Per-condition values and (too_low, too_high) masks, each shaped (rows, conditions)
+    Conditions whose parameter is not among `columns` are NaN and never trigger
+    """
+    table = _PRESET_TABLES[activity]
+    matrix = np.asarray(values_matrix, dtype=float)
+    col_index = {code: i for i, code in enumerate(columns)}
+    present = np.array([p in col_index for p in table["params"]], dtype=bool)
+    source = np.array([col_index[p] for p in table["params"] if p in col_index], dtype=np.intp)
+
+    values = np.full((matrix.shape[0], present.size), np.nan)
+    values[:, present] = matrix[:, source]
+    return values, values < table["mins"], values > table["maxs"]
+
+def score_activity_batch(activity: str, values_matrix, columns) -> np.ndarray:
+    """
+    Suitability scores (0-100) for many rows (e.g. days or locations) at once
+    
+    Args:
+        activity: Key of ACTIVITY_PRESETS
+        values_matrix: Array shaped (rows, len(columns))
+        columns: NASA POWER parameter code of each column
+    
+    Returns:
+        Integer score per row; -20 for every condition outside its ideal range
+    """
+    _, too_low, too_high = _violations(activity, values_matrix, columns)
+    return np.maximum(100 - 20 * (too_low.sum(axis=1) + too_high.sum(axis=1)), 0)
+
 def get_activity_suitability(activity: str, weather_data: dict) -> dict:
     """
     Evaluate suitability of weather conditions for a specific activity
@@ -68,26 +112,21 @@ def get_activity_suitability(activity: str, weather_data: dict) -> dict:
         return {"error": "Unknown activity"}
     
     preset = ACTIVITY_PRESETS[activity]
-    ideal = preset["ideal_conditions"]
-    
-    score = 100
-    issues = []
     
-    # Check each ideal condition
-    for condition, rules in ideal.items():
-        param = rules.get("parameter")
-        if param and param in weather_data:
-            value = weather_data[param]
-            
-            if "min" in rules and value < rules["min"]:
-                score -= 20
-                issues.append(f"{condition} too low ({value:.1f})")
-            
-            if "max" in rules and value > rules["max"]:
-                score -= 20
-                issues.append(f"{condition} too high ({value:.1f})")
+    # Same scoring as score_activity_batch, on a single row
+    columns = list(weather_data)
+    values, too_low, too_high = _violations(activity, [[weather_data[c] for c in columns]], columns)
+    score = int(max(0, 100 - 20 * (too_low.sum() + too_high.sum())))
     
-    score = max(0, score)
+    # Messages are only built when something is out of range
+    issues = []
+    if score < 100:
+        names = _PRESET_TABLES[activity]["names"]
+        for k in np.flatnonzero(too_low[0] | too_high[0]):
+            if too_low[0, k]:
+                issues.append(f"{names[k]} too low ({values[0, k]:.1f})")
+            if too_high[0, k]:
+                issues.append(f"{names[k]} too high ({values[0, k]:.1f})")
     
     if score >= 80:
         rating = "Excellent"
@@ -0,0 +1,33 @@
+# services/http_client.py
+"""
+Process-wide pooled HTTP client for outbound calls (NASA POWER, geocoding).
+Connections are kept alive (and multiplexed over HTTP/2) across requests
+instead of paying a TCP + TLS handshake per call.
+
+The client is opened and closed by the app lifespan in main.py, so every
+lifespan (e.g. each TestClient) gets a fresh one.
+"""
+
+from typing import Optional
+import httpx
+
+LIMITS = httpx.Limits(max_connections=32, max_keepalive_connections=32)
+USER_AGENT = "WeatherProbabilityApp/1.0"
+
+_client: Optional[httpx.AsyncClient] = None
+
+
+def create_client() -> httpx.AsyncClient:
+    return httpx.AsyncClient(http2=True, timeout=60, limits=LIMITS, headers={"User-Agent": USER_AGENT})
+
+
+def set_client(client: Optional[httpx.AsyncClient]):
+    global _client
+    _client = client
+
+
+def get_client() -> httpx.AsyncClient:
+    """The client opened by the running app's lifespan"""
+    if _client is None:
+        raise RuntimeError("HTTP client is not open; call set_client() (done by the app lifespan)")
+    return _client
@@ -0,0 +1,234 @@
+# services/nasa_cache.py
+"""
+In-process TTL + LRU cache in front of the NASA POWER daily API.
+Entries are stored per parameter so a request for ["T2M_MAX"] can be served
+from an earlier ["T2M_MAX", "T2M_MIN"] download and vice versa.
+
+Memory is bounded in bytes, per worker: parsed series are what stays resident;
+raw {date: value} dicts (~0.8 MB per 20-year parameter) are only held until parsed.
+
+When diskcache is installed, raw entries are also kept on disk (NASA_CACHE_DIR),
+shared by all workers and surviving restarts; memory misses fall back to it.
+Disk reads and writes run in worker threads, never on the event loop.
+"""
+
+import asyncio
+import os
+import tempfile
+import threading
+from datetime import date, timedelta
+from typing import Optional, Tuple
+from cachetools import TTLCache
+
+try:
+    import diskcache
+except ImportError:  # the disk tier is optional
+    diskcache = None
+
+from services.nasa_power_async import fetch_many
+from utils.parsed_series import ParsedSeries
+
+# NASA POWER meteorology comes from the MERRA-2 0.5° x 0.625° (lat x lon) grid;
+# nearby requests share a cell
+GRID_LAT_STEP = 0.5
+GRID_LON_STEP = 0.625
+
+# Approximate CPython footprint of one {"YYYYMMDD": float} item (key, value, dict slot)
+RAW_BYTES_PER_DAY = 110
+
+SERIES_CACHE_BYTES = int(os.getenv("NASA_SERIES_CACHE_MB", "48")) * 2**20
+RAW_CACHE_BYTES = int(os.getenv("NASA_RAW_CACHE_MB", "16")) * 2**20
+
+_cache = TTLCache(maxsize=RAW_CACHE_BYTES, ttl=6 * 3600, getsizeof=lambda raw: len(raw) * RAW_BYTES_PER_DAY)
+_series_cache = TTLCache(maxsize=SERIES_CACHE_BYTES, ttl=6 * 3600, getsizeof=lambda series: series.nbytes)
+_lock = threading.Lock()
+
+# Past days do not change, and history_window() moves the end date once a month,
+# so entries stay useful until the next month's keys take over
+DISK_TTL = 32 * 86400
+_disk = None
+if diskcache is not None:
+    _disk = diskcache.Cache(os.getenv("NASA_CACHE_DIR", os.path.join(tempfile.gettempdir(), "nasa_power_cache")))
+
+
+def history_window(years: int = 20, today: Optional[date] = None) -> Tuple[date, date]:
+    """
+    (start, end) covering `years` whole years up to the last complete month
+
+    Ending on a month boundary keeps cache keys stable for a month instead of
+    rolling daily; POWER's most recent days are usually still missing anyway.
+    """
+    first_of_month = (today or date.today()).replace(day=1)
+    return first_of_month.replace(year=first_of_month.year - years), first_of_month - timedelta(days=1)
+
+
+def _snap(coord: float, step: float) -> float:
+    return round(round(coord / step) * step, 4)
+
+
+def grid_cell(lat, lon):
+    """Centre of the POWER grid cell containing (lat, lon); downloads are made there so a payload matches its key"""
+    return _snap(lat, GRID_LAT_STEP), _snap(lon, GRID_LON_STEP)
+
+
+def location_key(lat, lon, start_date, end_date):
+    return grid_cell(lat, lon) + (start_date.strftime("%Y%m%d"), end_date.strftime("%Y%m%d"))
+
+
+def cache_key(lat, lon, start_date, end_date, parameter):
+    return location_key(lat, lon, start_date, end_date) + (parameter,)
+
+
+def _lookup(cache, lat, lon, start_date, end_date, parameters):
+    found = {}
+    with _lock:
+        for param in parameters:
+            hit = cache.get(cache_key(lat, lon, start_date, end_date, param))
+            if hit is not None:
+                found[param] = hit
+    return found
+
+
+def _store(cache, lat, lon, start_date, end_date, entries):
+    with _lock:
+        for param, value in entries.items():
+            cache[cache_key(lat, lon, start_date, end_date, param)] = value
+
+
+def _discard(cache, lat, lon, start_date, end_date, parameters):
+    with _lock:
+        for param in parameters:
+            cache.pop(cache_key(lat, lon, start_date, end_date, param), None)
+
+
+def _lookup_disk(lat, lon, start_date, end_date, parameters):
+    found = {}
+    if _disk is not None:
+        for param in parameters:
+            hit = _disk.get(cache_key(lat, lon, start_date, end_date, param))
+            if hit is not None:
+                found[param] = hit
+    return found
+
+
+def _store_disk(lat, lon, start_date, end_date, entries):
+    for param, value in entries.items():
+        _disk.set(cache_key(lat, lon, start_date, end_date, param), value, expire=DISK_TTL)
+
+
+def cache_parameters(lat, lon, start_date, end_date, entries):
+    """Hold freshly downloaded {code: {date: value}} entries in memory"""
+    _store(_cache, lat, lon, start_date, end_date, entries)
+
+
+async def persist_parameters(lat, lon, start_date, end_date, entries):
+    """Write freshly downloaded entries to the disk tier in a worker thread"""
+    if _disk is not None and entries:
+        await asyncio.to_thread(_store_disk, lat, lon, start_date, end_date, entries)
+
+
+def select_parameters(nasa, parameters):
+    fetched = nasa.get("properties", {}).get("parameter", {})
+    return {p: fetched[p] for p in parameters if p in fetched}
+
+
+def _parse(entries):
+    return {p: ParsedSeries.from_param_data(d) for p, d in entries.items()}
+
+
+def cached_series(lat, lon, start_date, end_date, parameters):
+    """Parsed series held in memory; raw in-memory hits are parsed once and memoized"""
+    series = _lookup(_series_cache, lat, lon, start_date, end_date, parameters)
+    missing = [p for p in parameters if p not in series]
+    if missing:
+        raw = _lookup(_cache, lat, lon, start_date, end_date, missing)
+        if raw:
+            series.update(cache_series(lat, lon, start_date, end_date, raw))
+    return series
+
+
+def cache_series(lat, lon, start_date, end_date, entries):
+    """Parse raw entries and memoize the result; the raw dicts leave memory. Returns {code: ParsedSeries}"""
+    parsed = _parse(entries)
+    _store(_series_cache, lat, lon, start_date, end_date, parsed)
+    _discard(_cache, lat, lon, start_date, end_date, entries)
+    return parsed
+
+
+def _series_from_disk(lat, lon, start_date, end_date, parameters):
+    raw = _lookup_disk(lat, lon, start_date, end_date, parameters)
+    return cache_series(lat, lon, start_date, end_date, raw) if raw else {}
+
+
+def _cells_from_disk(missing_by_cell, start_date, end_date):
+    return {
+        cell: _series_from_disk(*cell, start_date, end_date, missing)
+        for cell, missing in missing_by_cell.items()
+    }
+
+
+async def disk_series(lat, lon, start_date, end_date, parameters):
+    """Series from the disk tier; read, unpickled and parsed in a worker thread, then memoized"""
+    if _disk is None or not parameters:
+        return {}
+    return await asyncio.to_thread(_series_from_disk, lat, lon, start_date, end_date, parameters)
+
+
+async def _download_cells(cells, start_date, end_date, parameters):
+    # One concurrent download per grid cell, made at the cell centre
+    cells = list(cells)
+    responses = await fetch_many(cells, start_date, end_date, parameters)
+    fetched_by_cell = {
+        cell: select_parameters(nasa, parameters) for cell, nasa in zip(cells, responses) if nasa
+    }
+
+    def persist():
+        for (lat, lon), fetched in fetched_by_cell.items():
+            _store_disk(lat, lon, start_date, end_date, fetched)
+
+    if _disk is not None and fetched_by_cell:
+        await asyncio.to_thread(persist)
+    return fetched_by_cell
+
+
+async def get_cached_series_for_points(points, start_date, end_date, parameters):
+    """
+    Parsed series for many points; cache misses are fetched concurrently
+
+    Points falling in the same grid cell share one lookup and are downloaded once.
+
+    Returns:
+        List aligned with `points` of {code: ParsedSeries}, or None for failed points
+    """
+    by_cell = {}  # grid cell -> {code: ParsedSeries}, or None if its download failed
+    for lat, lon in points:
+        cell = grid_cell(lat, lon)
+        if cell not in by_cell:
+            by_cell[cell] = cached_series(*cell, start_date, end_date, parameters)
+
+    def missing_by_cell():
+        return {
+            cell: [p for p in parameters if p not in series]
+            for cell, series in by_cell.items() if len(series) < len(parameters)
+        }
+
+    pending = missing_by_cell()
+    if pending and _disk is not None:
+        # Disk tier next, every cell in a single worker-thread hop
+        for cell, series in (await asyncio.to_thread(_cells_from_disk, pending, start_date, end_date)).items():
+            by_cell[cell].update(series)
+        pending = missing_by_cell()
+
+    if pending:
+        downloaded = await _download_cells(pending, start_date, end_date, parameters)
+        for cell in pending:
+            if cell in downloaded:
+                by_cell[cell].update(cache_series(*cell, start_date, end_date, downloaded[cell]))
+            else:
+                by_cell[cell] = None
+
+    results = []
+    for lat, lon in points:
+        series = by_cell[grid_cell(lat, lon)]
+        results.append(None if series is None else {p: series[p] for p in parameters if p in series})
+    return results
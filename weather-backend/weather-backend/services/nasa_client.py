@@ -0,0 +1,99 @@
+# services/nasa_client.py
+"""
+Request-coalescing async NASA POWER client.
+Callers asking for the same grid cell and period within BATCH_WINDOW seconds
+share one download covering the union of their parameters; each caller gets
+back only what it asked for. Results go through the TTL cache in nasa_cache.
+"""
+
+import asyncio
+
+from services import nasa_cache
+from services.http_client import get_client
+from services.nasa_power_async import fetch
+
+# How long the first caller waits for siblings before the merged request is sent
+BATCH_WINDOW = 0.05
+
+
+class _Batch:
+    def __init__(self, lat, lon):
+        # Grid cell centre: the download must match the cache key it fills
+        self.lat, self.lon = nasa_cache.grid_cell(lat, lon)
+        self.parameters = []
+        self.open = True  # still accepting parameters
+        self.future = asyncio.get_running_loop().create_future()
+        self.task = None
+
+
+# location key -> batches collecting parameters or in flight
+_batches = {}
+
+
+async def _flush(key, batch, start_date, end_date):
+    await asyncio.sleep(BATCH_WINDOW)
+    batch.open = False
+    fetched = None
+    try:
+        nasa = await fetch(get_client(), batch.lat, batch.lon, start_date, end_date, batch.parameters)
+        if nasa:
+            fetched = nasa_cache.select_parameters(nasa, batch.parameters)
+            nasa_cache.cache_parameters(batch.lat, batch.lon, start_date, end_date, fetched)
+        batch.future.set_result(fetched)
+    except Exception as e:
+        batch.future.set_exception(e)
+    finally:
+        _batches[key].remove(batch)
+        if not _batches[key]:
+            del _batches[key]
+
+    # Waiters already have their data; the disk write happens after
+    if fetched:
+        await nasa_cache.persist_parameters(batch.lat, batch.lon, start_date, end_date, fetched)
+
+
+async def _coalesced_fetch(lat, lon, start_date, end_date, parameters):
+    key = nasa_cache.location_key(lat, lon, start_date, end_date)
+    batch = None
+    for candidate in _batches.get(key, []):
+        # Join a batch still collecting, or one in flight that already covers us
+        if candidate.open or set(parameters) <= set(candidate.parameters):
+            batch = candidate
+            break
+
+    if batch is None:
+        batch = _Batch(lat, lon)
+        _batches.setdefault(key, []).append(batch)
+        batch.task = asyncio.create_task(_flush(key, batch, start_date, end_date))
+
+    if batch.open:
+        batch.parameters.extend(p for p in parameters if p not in batch.parameters)
+
+    # Shielded so one cancelled caller does not cancel the download for the others
+    return await asyncio.shield(batch.future)
+
+
+async def get_series(lat, lon, start_date, end_date, parameters):
+    """
+    Cached NASA POWER download as parsed NumPy series; concurrent misses for one
+    location share a request and each entry is parsed once
+
+    Returns:
+        {code: ParsedSeries} or None if error
+    """
+    series = nasa_cache.cached_series(lat, lon, start_date, end_date, parameters)
+    series.update(await nasa_cache.disk_series(lat, lon, start_date, end_date, [p for p in parameters if p not in series]))
+
+    missing = [p for p in parameters if p not in series]
+    if missing:
+        # Memory and disk already missed; go straight to the (coalesced) download
+        fetched = await _coalesced_fetch(lat, lon, start_date, end_date, missing)
+        if fetched is None:
+            return None
+        # The first waiter of a batch parses; the others find the result memoized
+        series.update(nasa_cache.cached_series(lat, lon, start_date, end_date, missing))
+        unparsed = {p: fetched[p] for p in missing if p in fetched and p not in series}
+        if unparsed:
+            series.update(nasa_cache.cache_series(lat, lon, start_date, end_date, unparsed))
+
+    return {p: series[p] for p in parameters if p in series}
@@ -0,0 +1,51 @@
+# services/nasa_power_async.py
+"""
+Non-blocking NASA POWER client for fan-out requests (e.g. polygon grid points)
+"""
+
+import asyncio
+import httpx
+
+from services.http_client import get_client
+from services.nasa_power import BASE_URL, build_request_params
+
+# Concurrent requests per fan-out; keeps us polite to the NASA POWER service
+MAX_CONCURRENT_REQUESTS = 16
+
+
+async def fetch(client: httpx.AsyncClient, lat, lon, start_date, end_date, parameters, semaphore=None):
+    """
+    Fetch historical weather data from NASA POWER using a shared httpx client
+
+    Returns:
+        Dictionary with weather data or None if error
+    """
+    params = build_request_params(lat, lon, start_date, end_date, parameters)
+
+    try:
+        if semaphore is None:
+            response = await client.get(BASE_URL, params=params)
+        else:
+            async with semaphore:
+                response = await client.get(BASE_URL, params=params)
+        response.raise_for_status()
+        return response.json()
+    except httpx.HTTPError as e:
+        print(f"NASA API Error: {e}")
+        return None
+
+
+async def fetch_many(points, start_date, end_date, parameters):
+    """
+    Fetch the same parameters for many (lat, lon) points concurrently
+
+    Returns:
+        List aligned with `points`; failed points are None
+    """
+    client = get_client()
+    semaphore = asyncio.Semaphore(MAX_CONCURRENT_REQUESTS)
+    results = await asyncio.gather(
+        *[fetch(client, lat, lon, start_date, end_date, parameters, semaphore) for lat, lon in points],
+        return_exceptions=True,
+    )
+    return [None if isinstance(r, BaseException) else r for r in results]
@@ -1,4 +1,5 @@
 # services/thresholds.py
+import numpy as np
 
 EXTREME_WEATHER_THRESHOLDS = {
     "heatwave": {
@@ -65,3 +66,33 @@ EXTREME_WEATHER_THRESHOLDS = {
         "description": "Very humid conditions"
     },
 }
+
+# Struct-of-arrays view of EXTREME_WEATHER_THRESHOLDS (same order), so every
+# condition defined on a parameter is evaluated in one broadcast comparison
+THRESHOLD_NAMES = tuple(EXTREME_WEATHER_THRESHOLDS)
+THRESHOLD_PARAMS = np.array([t["parameter"] for t in EXTREME_WEATHER_THRESHOLDS.values()])
+THRESHOLD_VALUES = np.array([t["default_threshold"] for t in EXTREME_WEATHER_THRESHOLDS.values()], dtype=float)
+THRESHOLD_ABOVE = np.array([t["condition"] == "above" for t in EXTREME_WEATHER_THRESHOLDS.values()], dtype=bool)
+
+
+def evaluate_all(parameter, values):
+    """
+    Probability of every condition whose thresholds are defined on `parameter`
+
+    Args:
+        parameter: NASA POWER parameter code, e.g. "T2M_MAX"
+        values: 1-D array of daily values without missing data
+
+    Returns:
+        {condition_type: probability 0.0-1.0}, empty if nothing to evaluate
+    """
+    selected = np.flatnonzero(THRESHOLD_PARAMS == parameter)
+    values = np.asarray(values)
+    if not selected.size or not values.size:
+        return {}
+
+    thresholds = THRESHOLD_VALUES[selected]
+    column = values[:, None]
+    hits = np.where(THRESHOLD_ABOVE[selected], column > thresholds, column < thresholds)
+    probabilities = np.count_nonzero(hits, axis=0) / values.size
+    return {THRESHOLD_NAMES[i]: round(float(p), 3) for i, p in zip(selected, probabilities)}
@@ -0,0 +1,42 @@
+# tests/conftest.py
+import importlib.util
+import sys
+from functools import lru_cache
+
+import pytest
+
+from utils import calculations, kernels_numba
+
+KERNEL_NAMES = ("PROB_FN", "TREND_FN", "histogram_counts", "summary_stats", "ray_cast")
+
+
+@lru_cache(maxsize=None)
+def _numpy_kernels():
+    # A second copy of utils/kernels_numba.py imported with Numba hidden, i.e. the NumPy fallbacks
+    spec = importlib.util.spec_from_file_location("kernels_numpy", kernels_numba.__file__)
+    module = importlib.util.module_from_spec(spec)
+    saved = sys.modules.get("numba")
+    sys.modules["numba"] = None
+    try:
+        spec.loader.exec_module(module)
+    finally:
+        if saved is None:
+            del sys.modules["numba"]
+        else:
+            sys.modules["numba"] = saved
+    return module
+
+
+@pytest.fixture(params=["numba", "numpy"])
+def kernels(request, monkeypatch):
+    """Runs a test against both kernel implementations, wired into utils.calculations"""
+    if request.param == "numba":
+        if not kernels_numba.HAS_NUMBA:
+            pytest.skip("Numba is not installed")
+        module = kernels_numba
+    else:
+        module = _numpy_kernels()
+        assert not module.HAS_NUMBA
+    for name in KERNEL_NAMES:
+        monkeypatch.setattr(calculations, name, getattr(module, name))
+    return module
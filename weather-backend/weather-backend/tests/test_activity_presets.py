@@ -0,0 +1,62 @@
+# tests/test_activity_presets.py
+"""
+Vectorized activity scoring checked against the original per-condition loop
+"""
+
+import numpy as np
+import pytest
+
+from services.activity_presets import ACTIVITY_PRESETS, get_activity_suitability, score_activity_batch
+
+PARAMETERS = ["T2M", "PRECTOTCORR", "CLOUD_AMT", "WS10M", "RH2M", "SNODP"]
+
+
+def reference_suitability(activity, weather_data):
+    preset = ACTIVITY_PRESETS[activity]
+    score = 100
+    issues = []
+    for condition, rules in preset["ideal_conditions"].items():
+        param = rules.get("parameter")
+        if param and param in weather_data:
+            value = weather_data[param]
+            if "min" in rules and value < rules["min"]:
+                score -= 20
+                issues.append(f"{condition} too low ({value:.1f})")
+            if "max" in rules and value > rules["max"]:
+                score -= 20
+                issues.append(f"{condition} too high ({value:.1f})")
+    return max(0, score), issues
+
+
+def random_weather(rng):
+    # A random subset of parameters; whole numbers land on the preset bounds often
+    columns = [p for p in PARAMETERS if rng.random() < 0.8]
+    return {p: float(rng.integers(-15, 110)) for p in columns}
+
+
+@pytest.mark.parametrize("activity", list(ACTIVITY_PRESETS))
+def test_suitability_matches_reference(activity):
+    rng = np.random.default_rng(len(activity))
+    for _ in range(300):
+        weather = random_weather(rng)
+        score, issues = reference_suitability(activity, weather)
+
+        result = get_activity_suitability(activity, weather)
+
+        assert (result["score"], result["issues"]) == (score, issues)
+
+
+@pytest.mark.parametrize("activity", list(ACTIVITY_PRESETS))
+def test_batch_scores_match_reference(activity):
+    rng = np.random.default_rng(len(activity) + 100)
+    columns = ["WS10M", "T2M", "RH2M", "PRECTOTCORR"]  # deliberately missing some preset parameters
+    matrix = rng.integers(-15, 110, (500, len(columns))).astype(float)
+
+    scores = score_activity_batch(activity, matrix, columns)
+
+    expected = [reference_suitability(activity, dict(zip(columns, row)))[0] for row in matrix.tolist()]
+    assert scores.tolist() == expected
+
+
+def test_unknown_activity():
+    assert get_activity_suitability("surfing", {"T2M": 20.0}) == {"error": "Unknown activity"}
@@ -0,0 +1,107 @@
+# tests/test_air_quality.py
+"""
+Vectorized air quality proxy checked against the original per-day scoring
+"""
+
+import asyncio
+
+import numpy as np
+import pytest
+
+from services import nasa_air_quality
+from services.nasa_air_quality import AIR_QUALITY_PARAMETERS, calculate_air_quality_proxy_vec
+from utils.parsed_series import MISSING_VALUE, ParsedSeries
+
+DATES = [
+    str(d).replace("-", "")
+    for d in np.arange(np.datetime64("2005-01-01"), np.datetime64("2025-01-01"))
+]
+
+
+def reference_aqi_proxy(temp, humidity, wind_speed, precip):
+    score = 0
+    if temp > 35:
+        score += 2
+    elif temp > 30:
+        score += 1
+    if wind_speed < 2:
+        score += 2
+    elif wind_speed < 5:
+        score += 1
+    if precip < 1:
+        score += 1
+    if humidity > 70:
+        score += 1
+    if score <= 1:
+        return 1
+    elif score <= 2:
+        return 2
+    elif score <= 3:
+        return 3
+    elif score <= 5:
+        return 4
+    return 5
+
+
+def test_proxy_matches_reference():
+    rng = np.random.default_rng(0)
+    n = 100_000
+    # Half-unit steps put many days exactly on the 30/35, 2/5, 1 and 70 boundaries
+    temp = rng.integers(40, 80, n) / 2
+    humidity = rng.integers(120, 170, n) / 2
+    wind = rng.integers(0, 14, n) / 2
+    precip = rng.integers(0, 6, n) / 2
+
+    for dtype in (np.float64, np.float32):
+        score = calculate_air_quality_proxy_vec(
+            temp.astype(dtype), humidity.astype(dtype), wind.astype(dtype), precip.astype(dtype)
+        )
+
+        expected = [reference_aqi_proxy(*day) for day in zip(temp.tolist(), humidity.tolist(), wind.tolist(), precip.tolist())]
+        assert ((score >= 3) == (np.array(expected) >= 3)).all()
+    assert set(expected) == {1, 2, 3, 4, 5}  # every band is exercised
+
+
+def reference_probability(params, month):
+    temps, humidity, wind, precip = (
+        {k: v for k, v in params[p].items() if int(k[4:6]) == month} for p in AIR_QUALITY_PARAMETERS
+    )
+    poor_air_days = total_days = 0
+    for date_key in temps:
+        if date_key in humidity and date_key in wind and date_key in precip:
+            day = (temps[date_key], humidity[date_key], wind[date_key], precip[date_key])
+            if MISSING_VALUE not in day:
+                total_days += 1
+                if reference_aqi_proxy(*day) >= 3:
+                    poor_air_days += 1
+    return round(poor_air_days / total_days, 3), total_days
+
+
+def random_params(seed):
+    rng = np.random.default_rng(seed)
+    ranges = {"T2M": (50, 80), "RH2M": (120, 170), "WS10M": (0, 14), "PRECTOTCORR": (0, 6)}
+    params = {}
+    for i, p in enumerate(AIR_QUALITY_PARAMETERS):
+        values = rng.integers(*ranges[p], len(DATES)) / 2
+        values[rng.random(len(DATES)) < 0.05] = MISSING_VALUE
+        # Separately cached series need not share a date axis
+        keep = rng.random(len(DATES)) > 0.1 * i
+        params[p] = {k: v for k, v, kept in zip(DATES, values.tolist(), keep) if kept}
+    return params
+
+
+@pytest.mark.parametrize("seed", range(4))
+def test_probability_matches_reference(monkeypatch, seed):
+    params = random_params(seed)
+
+    async def fake_get_series(lat, lon, start_date, end_date, parameters):
+        return {p: ParsedSeries.from_param_data(params[p]) for p in parameters}
+
+    monkeypatch.setattr(nasa_air_quality, "get_series", fake_get_series)
+
+    for month in (1, 7):
+        result = asyncio.run(nasa_air_quality.get_air_quality_probability(1.0, 2.0, month))
+
+        probability, total_days = reference_probability(params, month)
+        assert result["poor_air_quality_probability"] == probability
+        assert result["days_analyzed"] == total_days
@@ -0,0 +1,173 @@
+# tests/test_calculations.py
+"""
+Kernels behind utils/calculations.py checked against the original dict/NumPy code,
+for both the Numba and the NumPy implementations
+"""
+
+import numpy as np
+import pytest
+
+from utils.calculations import (
+    analyze_trend_yearly_extremes, calculate_probability, make_histogram, make_histograms,
+    month_mask, probs_above_many, probs_below_many, select_mask, summarize_values,
+)
+from utils.parsed_series import MISSING_VALUE, ParsedSeries
+
+DATES = [
+    str(d).replace("-", "")
+    for d in np.arange(np.datetime64("2000-01-01"), np.datetime64("2020-01-01"))
+]
+
+
+def random_param_data(seed, missing=0.05):
+    # POWER publishes 2 decimals; -999 marks missing days
+    rng = np.random.default_rng(seed)
+    values = np.round(rng.normal(20, 8, len(DATES)), 2)
+    values[rng.random(len(DATES)) < missing] = MISSING_VALUE
+    return dict(zip(DATES, values.tolist()))
+
+
+def reference_probability(filtered_data, threshold, condition_type):
+    values = [v for v in filtered_data.values() if v is not None and v != MISSING_VALUE]
+    if not values:
+        return None
+    if condition_type == "above":
+        exceeding_count = sum(1 for v in values if v > threshold)
+    else:
+        exceeding_count = sum(1 for v in values if v < threshold)
+    return round(exceeding_count / len(values), 3)
+
+
+@pytest.mark.parametrize("condition_type", ["above", "below"])
+@pytest.mark.parametrize("seed", range(3))
+def test_probability_matches_reference(kernels, seed, condition_type):
+    param_data = random_param_data(seed)
+    series = ParsedSeries.from_param_data(param_data)
+    # Thresholds taken from the data exercise the strict comparison
+    thresholds = [0.0, 20.0, 35.5] + list(param_data.values())[:20]
+
+    for month in range(1, 13):
+        filtered = {k: v for k, v in param_data.items() if int(k[4:6]) == month}
+        mask = month_mask(series, month)
+        for threshold in thresholds:
+            expected = reference_probability(filtered, threshold, condition_type)
+            assert calculate_probability(series.values, mask, threshold, condition_type) == expected
+
+
+def test_probability_of_empty_selection_is_none(kernels):
+    series = ParsedSeries.from_param_data({"20200101": MISSING_VALUE, "20200201": 3.0})
+
+    assert calculate_probability(series.values, month_mask(series, 1), 0.0, "above") is None
+    assert calculate_probability(series.values, month_mask(series, 3), 0.0, "below") is None
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_many_thresholds_match_single_counts(seed):
+    series = ParsedSeries.from_param_data(random_param_data(seed))
+    values = series.values[month_mask(series, 6)]
+    thresholds = sorted(set(values[:30].tolist())) + [-100.0, 0.0, 20.0, 100.0]
+
+    above = probs_above_many(values, thresholds)
+    below = probs_below_many(values, thresholds)
+
+    for i, threshold in enumerate(thresholds):
+        assert above[i] == np.count_nonzero(values > threshold) / values.size
+        assert below[i] == np.count_nonzero(values < threshold) / values.size
+
+
+def test_many_thresholds_of_no_values():
+    assert probs_above_many(np.array([]), [1.0, 2.0]).tolist() == [0.0, 0.0]
+    assert probs_below_many(np.array([]), [1.0, 2.0]).tolist() == [0.0, 0.0]
+
+
+@pytest.mark.parametrize("bins", [1, 7, 24, 200])
+@pytest.mark.parametrize("seed", range(3))
+def test_auto_histogram_matches_numpy(kernels, seed, bins):
+    rng = np.random.default_rng(seed)
+    values = np.round(rng.normal(10, 5, 5000), 1)
+    values = np.concatenate([values, values.min() + (values.max() - values.min()) * np.arange(bins + 1) / bins])
+
+    for arr in (values, values.astype(np.float32)):
+        counts, edges = np.histogram(arr, bins=bins)
+        histogram = make_histogram(arr, bins=bins)
+
+        assert histogram["counts"] == counts.tolist()
+        assert histogram["bins"] == [round(float(b), 3) for b in edges.tolist()]
+
+
+@pytest.mark.parametrize("parameter, low, high", [
+    ("T2M_MAX", -50, 60),      # uniform edges, with underflow and overflow
+    ("PRECTOTCORR", -1, 600),  # uneven edges
+    ("RH2M", 0, 100),          # values on the outer edges
+])
+def test_fixed_histogram_matches_numpy(kernels, parameter, low, high):
+    rng = np.random.default_rng(0)
+    values = np.round(rng.uniform(low, high, 5000), 1).astype(np.float32)
+    values[:3] = [np.nan, low, high]
+
+    histogram = make_histogram(values, bins="fixed", parameter=parameter)
+
+    edges = np.asarray(histogram["bins"])
+    valid = values[~np.isnan(values)]
+    counts, _ = np.histogram(valid, bins=edges)
+    assert histogram["counts"] == counts.tolist()
+    assert histogram["underflow"] == np.count_nonzero(valid < edges[0])
+    assert histogram["overflow"] == np.count_nonzero(valid > edges[-1])
+    assert sum(counts) + histogram["underflow"] + histogram["overflow"] == valid.size
+
+
+def test_fixed_histogram_needs_known_edges():
+    with pytest.raises(ValueError):
+        make_histogram(np.arange(10.0), bins="fixed", parameter="SNODP")
+
+
+def test_make_histograms_shares_fixed_edges(kernels):
+    rng = np.random.default_rng(1)
+    values = {"T2M_MAX": rng.uniform(0, 40, 100), "WS10M": rng.uniform(0, 10, 100)}
+
+    histograms = make_histograms(values)
+
+    assert list(histograms) == ["T2M_MAX", "WS10M"]
+    for parameter, histogram in histograms.items():
+        assert histogram == make_histogram(values[parameter], bins="fixed", parameter=parameter)
+    assert make_histograms(values, bins=8)["WS10M"] == make_histogram(values["WS10M"], bins=8)
+
+
+def test_summary_matches_nanpercentile(kernels):
+    for seed in range(3):
+        series = ParsedSeries.from_param_data(random_param_data(seed, missing=0.2))
+        values = series.values[select_mask(series, season="jja")]
+        arr = values.astype(np.float64)
+
+        mean, median, p75, p95 = kernels.summary_stats(values)
+
+        assert mean == pytest.approx(np.nanmean(arr), rel=1e-9)
+        assert median == pytest.approx(np.nanmedian(arr), rel=1e-9)
+        assert p75 == pytest.approx(np.nanpercentile(arr, 75), rel=1e-9)
+        assert p95 == pytest.approx(np.nanpercentile(arr, 95), rel=1e-9)
+        assert summarize_values(values)["count"] == values.size
+
+
+@pytest.mark.parametrize("condition_type", ["above", "below"])
+def test_trend_matches_polyfit(kernels, condition_type):
+    for seed in range(3):
+        series = ParsedSeries.from_param_data(random_param_data(seed))
+        mask = month_mask(series, 7)
+        threshold = 25.0 if condition_type == "above" else 15.0
+
+        trend = analyze_trend_yearly_extremes(series, mask, threshold, condition_type)
+
+        selected = series.values[mask]
+        ok = selected > threshold if condition_type == "above" else selected < threshold
+        years, counts = np.unique(series.years[mask][ok], return_counts=True)
+        slope, _ = np.polyfit(years, counts.astype(float), 1)
+        assert trend["yearly_counts"] == dict(zip(years.tolist(), counts.tolist()))
+        assert trend["slope"] == pytest.approx(round(float(slope), 4), abs=1e-4)
+
+
+def test_trend_without_events_is_flat(kernels):
+    series = ParsedSeries.from_param_data(random_param_data(0))
+
+    trend = analyze_trend_yearly_extremes(series, month_mask(series, 1), 1000.0, "above")
+
+    assert trend == {"yearly_counts": {}, "slope": 0.0, "trend": "flat"}
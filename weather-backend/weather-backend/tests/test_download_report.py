@@ -0,0 +1,77 @@
+# tests/test_download_report.py
+"""
+/download-report checked against the original csv.writer / raw-dict output
+"""
+
+import csv
+import io
+
+import numpy as np
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from routers import probability
+from utils.parsed_series import MISSING_VALUE, ParsedSeries
+
+DATES = [
+    str(d).replace("-", "")
+    for d in np.arange(np.datetime64("2005-01-01"), np.datetime64("2025-01-01"))
+]
+
+
+def random_param_data(seed):
+    rng = np.random.default_rng(seed)
+    values = np.round(rng.uniform(-30, 45, len(DATES)), 2)
+    values[rng.random(len(DATES)) < 0.05] = MISSING_VALUE
+    return dict(zip(DATES, values.tolist()))
+
+
+def report_params(month, **extra):
+    params = {"lat": 1.0, "lon": 2.0, "condition_type": "heatwave", **extra}
+    if month:
+        params["month"] = month
+    return params
+
+
+@pytest.fixture
+def client(monkeypatch):
+    raw = {}
+
+    async def fake_get_series(lat, lon, start_date, end_date, parameters):
+        return {p: ParsedSeries.from_param_data(raw[lat]) for p in parameters}
+
+    monkeypatch.setattr(probability, "get_series", fake_get_series)
+    app = FastAPI()
+    app.include_router(probability.router)
+    return TestClient(app), raw
+
+
+@pytest.mark.parametrize("month", [None, 2, 12])
+def test_csv_matches_reference(client, month):
+    client, raw = client
+    raw[1.0] = param_data = random_param_data(month or 0)
+
+    response = client.get("/download-report", params=report_params(month))
+
+    expected = io.StringIO()
+    writer = csv.writer(expected)
+    writer.writerow(["Date", "Value", "Parameter", "Unit", "Location_Lat", "Location_Lon"])
+    for date_str, value in param_data.items():
+        if value != MISSING_VALUE and (not month or int(date_str[4:6]) == month):
+            writer.writerow([date_str, value, "T2M_MAX", "°C", 1.0, 2.0])
+    assert response.status_code == 200
+    assert response.text == expected.getvalue()
+
+
+@pytest.mark.parametrize("month", [None, 7])
+def test_json_matches_reference(client, month):
+    client, raw = client
+    raw[1.0] = param_data = random_param_data(3)
+
+    response = client.get("/download-report", params=report_params(month, format="json"))
+
+    expected = {k: v for k, v in param_data.items() if not month or int(k[4:6]) == month}
+    assert response.status_code == 200
+    assert response.json()["data"] == expected
+    assert ":-999.0" in response.text  # the float sentinel, as POWER sends it
@@ -0,0 +1,97 @@
+# tests/test_extreme_weather.py
+"""
+/extreme-weather endpoints against a faked NASA POWER series
+"""
+
+import numpy as np
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from routers import probability
+from services.thresholds import evaluate_all
+from utils.calculations import make_histogram
+from utils.parsed_series import MISSING_VALUE, ParsedSeries
+
+DATES = [
+    str(d).replace("-", "")
+    for d in np.arange(np.datetime64("2005-01-01"), np.datetime64("2025-01-01"))
+]
+
+
+@pytest.fixture
+def client(monkeypatch):
+    rng = np.random.default_rng(0)
+    values = np.round(rng.uniform(0, 45, len(DATES)), 2)
+    values[rng.random(len(DATES)) < 0.05] = MISSING_VALUE
+    series = ParsedSeries.from_param_data(dict(zip(DATES, values.tolist())))
+    fetched = []
+
+    async def fake_get_series(lat, lon, start_date, end_date, parameters):
+        fetched.append(parameters)
+        return {p: series for p in parameters}
+
+    monkeypatch.setattr(probability, "get_series", fake_get_series)
+    app = FastAPI()
+    app.include_router(probability.router)
+    return TestClient(app), series, fetched
+
+
+def test_histogram_rejects_fixed_bins_without_edges(client):
+    client, _, fetched = client
+
+    response = client.post(
+        "/extreme-weather/histogram", json={"lat": 1.0, "lon": 2.0, "parameter": "SNODP", "bins": "fixed"}
+    )
+
+    assert response.status_code == 422
+    assert not fetched
+
+
+@pytest.mark.parametrize("bins", [24, "fixed"])
+def test_histogram_bins(client, bins):
+    client, _, _ = client
+
+    response = client.post(
+        "/extreme-weather/histogram", json={"lat": 1.0, "lon": 2.0, "parameter": "T2M_MAX", "bins": bins}
+    )
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["metadata"]["bins"] == bins
+    assert ("underflow" in body["histogram"]) == (bins == "fixed")
+
+
+@pytest.mark.parametrize("bins", [24, "fixed"])
+def test_analysis(client, bins):
+    client, series, fetched = client
+
+    response = client.get(
+        "/extreme-weather/analysis",
+        params={"lat": 1.0, "lon": 2.0, "condition_type": "hot_day", "month": 6, "bins": bins},
+    )
+
+    assert response.status_code == 200
+    body = response.json()
+    values = series.values[series.valid_mask & (series.months == 6)]
+    assert fetched == [["T2M_MAX"]]
+    assert body["parameter"] == "T2M_MAX"
+    assert body["probability"] == round(np.count_nonzero(values > 35.0) / values.size, 3)
+    assert body["histogram"] == make_histogram(values, bins=bins, parameter="T2M_MAX")
+    assert sum(body["histogram"]["counts"]) + body["histogram"].get("underflow", 0) + body["histogram"].get("overflow", 0) == values.size
+    assert body["related_conditions"] == evaluate_all("T2M_MAX", values)
+    assert set(body["related_conditions"]) == {"heatwave", "hot_day", "warm_day"}
+    assert body["related_conditions"]["hot_day"] == body["probability"]
+    assert body["metadata"]["bins"] == bins
+    assert body["statistics"]["data_points"] == values.size
+
+
+def test_analysis_rejects_unknown_bins(client):
+    client, _, fetched = client
+
+    response = client.get(
+        "/extreme-weather/analysis", params={"lat": 1.0, "lon": 2.0, "condition_type": "hot_day", "bins": "auto"}
+    )
+
+    assert response.status_code == 422
+    assert not fetched
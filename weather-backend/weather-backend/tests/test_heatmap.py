@@ -0,0 +1,63 @@
+# tests/test_heatmap.py
+"""
+Seasonal heatmap best/worst months checked against the original sort-based selection
+"""
+
+import numpy as np
+import pytest
+
+from routers.probability import _compute_heatmap
+from services.thresholds import EXTREME_WEATHER_THRESHOLDS
+from utils.parsed_series import MISSING_VALUE, ParsedSeries
+
+DATES = [
+    str(d).replace("-", "")
+    for d in np.arange(np.datetime64("2000-01-01"), np.datetime64("2020-01-01"))
+]
+
+
+def reference_heatmap(param_data, condition_type):
+    cfg = EXTREME_WEATHER_THRESHOLDS[condition_type]
+    threshold, condition = cfg["default_threshold"], cfg["condition"]
+    monthly_probabilities = {}
+    for month in range(1, 13):
+        values = [
+            v for k, v in param_data.items()
+            if int(k[4:6]) == month and v is not None and v != MISSING_VALUE
+        ]
+        hits = sum(1 for v in values if (v > threshold if condition == "above" else v < threshold))
+        monthly_probabilities[month] = round(hits / len(values), 3) if values else 0
+    sorted_months = sorted(monthly_probabilities.items(), key=lambda x: x[1])
+    return monthly_probabilities, sorted_months[:3], sorted_months[-3:]
+
+
+def random_param_data(rng, low, high, missing=0.05, empty_months=()):
+    # Whole-degree values so thresholds are hit exactly and probabilities tie often
+    values = rng.integers(low, high, len(DATES)).astype(float)
+    values[rng.random(len(DATES)) < missing] = MISSING_VALUE
+    return {
+        k: (MISSING_VALUE if int(k[4:6]) in empty_months else v)
+        for k, v in zip(DATES, values.tolist())
+    }
+
+
+CASES = [
+    ("heatwave", dict(low=20, high=45)),
+    ("heatwave", dict(low=0, high=30)),  # never above: every month ties at 0
+    ("cold_wave", dict(low=4, high=7)),
+    ("heavy_rain", dict(low=0, high=52, empty_months=(2, 7))),
+    ("high_wind", dict(low=14, high=17, missing=0.5)),
+]
+
+
+@pytest.mark.parametrize("seed", range(5))
+@pytest.mark.parametrize("condition_type, spec", CASES)
+def test_heatmap_matches_reference(condition_type, spec, seed):
+    param_data = random_param_data(np.random.default_rng(seed), **spec)
+
+    heatmap = _compute_heatmap(ParsedSeries.from_param_data(param_data), condition_type)
+    monthly, best, worst = reference_heatmap(param_data, condition_type)
+
+    assert heatmap["heatmap_data"] == monthly
+    assert [(m["month"], m["probability"]) for m in heatmap["best_months"]] == best
+    assert [(m["month"], m["probability"]) for m in heatmap["worst_months"]] == worst
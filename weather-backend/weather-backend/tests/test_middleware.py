@@ -0,0 +1,140 @@
+# tests/test_middleware.py
+"""
+ETag / 304 handling in middleware.ETagMiddleware
+"""
+
+import pytest
+from fastapi import FastAPI
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
+from fastapi.testclient import TestClient
+
+from middleware import DEFAULT_CACHE_CONTROL, ETagMiddleware, etag_matches
+
+app = FastAPI()
+app.add_middleware(ETagMiddleware)
+
+
+@app.get("/api/data")
+def data():
+    return {"probability": 0.25}
+
+
+@app.post("/api/data")
+def post_data():
+    return {"probability": 0.25}
+
+
+@app.get("/api/chunked")
+def chunked():
+    return StreamingResponse(iter([b'{"a":', b" 1}"]), media_type="application/json")
+
+
+@app.get("/api/text")
+def text():
+    return PlainTextResponse("hello")
+
+
+@app.get("/api/missing")
+def missing():
+    return JSONResponse({"detail": "Not found"}, status_code=404)
+
+
+@app.get("/api/tagged")
+def tagged():
+    return JSONResponse({"a": 1}, headers={"ETag": '"v1"'})
+
+
+@app.get("/api/private")
+def private():
+    return JSONResponse({"a": 1}, headers={"Cache-Control": "no-store"})
+
+
+@app.get("/health")
+def health():
+    return {"status": "ok"}
+
+
+@pytest.fixture(scope="module")
+def client():
+    return TestClient(app)
+
+
+def test_json_get_is_tagged(client):
+    response = client.get("/api/data")
+
+    assert response.status_code == 200
+    assert response.json() == {"probability": 0.25}
+    assert response.headers["etag"].startswith('W/"')
+    assert response.headers["cache-control"] == DEFAULT_CACHE_CONTROL
+    assert client.get("/api/data").headers["etag"] == response.headers["etag"]
+
+
+def test_streamed_body_is_tagged_whole(client):
+    response = client.get("/api/chunked")
+
+    assert response.content == b'{"a": 1}'
+    assert "etag" in response.headers
+
+
+def test_existing_cache_control_is_kept(client):
+    response = client.get("/api/private")
+
+    assert "etag" in response.headers
+    assert response.headers["cache-control"] == "no-store"
+
+
+@pytest.mark.parametrize("if_none_match", [
+    "{etag}",
+    "{bare}",
+    '"other", {etag}',
+    "*",
+])
+def test_matching_if_none_match_returns_304(client, if_none_match):
+    etag = client.get("/api/data").headers["etag"]
+    header = if_none_match.format(etag=etag, bare=etag.removeprefix("W/"))
+
+    response = client.get("/api/data", headers={"If-None-Match": header})
+
+    assert response.status_code == 304
+    assert response.content == b""
+    assert response.headers["etag"] == etag
+    assert "content-type" not in response.headers
+
+
+def test_stale_if_none_match_returns_full_body(client):
+    response = client.get("/api/data", headers={"If-None-Match": 'W/"stale"'})
+
+    assert response.status_code == 200
+    assert response.json() == {"probability": 0.25}
+    assert response.headers["etag"] != 'W/"stale"'
+
+
+@pytest.mark.parametrize("method, path", [
+    ("GET", "/api/text"),
+    ("GET", "/api/missing"),
+    ("POST", "/api/data"),
+    ("GET", "/health"),
+])
+def test_other_responses_pass_through(client, method, path):
+    response = client.request(method, path, headers={"If-None-Match": "*"})
+
+    assert response.status_code != 304
+    assert "etag" not in response.headers
+    assert "cache-control" not in response.headers
+
+
+def test_existing_etag_is_left_alone(client):
+    response = client.get("/api/tagged", headers={"If-None-Match": '"v1"'})
+
+    assert response.status_code == 200
+    assert response.headers["etag"] == '"v1"'
+    assert "cache-control" not in response.headers
+
+
+def test_etag_matches():
+    assert etag_matches('W/"abc"', 'W/"abc"')
+    assert etag_matches('"abc"', 'W/"abc"')
+    assert etag_matches(' "x" , W/"abc"', 'W/"abc"')
+    assert etag_matches(" * ", 'W/"abc"')
+    assert not etag_matches('W/"abd"', 'W/"abc"')
+    assert not etag_matches('"abc', 'W/"abc"')
@@ -0,0 +1,171 @@
+# tests/test_nasa_client.py
+"""
+Request coalescing in services/nasa_client.py, against a fake POWER download
+"""
+
+import asyncio
+from datetime import date
+
+import pytest
+
+from services import nasa_cache, nasa_client
+
+START, END = date(2020, 1, 1), date(2020, 12, 31)
+
+
+class FakeFetch:
+    def __init__(self, fail=None, empty=False):
+        self.calls = []
+        self.fail = fail
+        self.empty = empty
+        self.release = None
+
+    async def __call__(self, client, lat, lon, start_date, end_date, parameters):
+        self.calls.append((lat, lon, tuple(parameters)))
+        if self.release is not None:
+            await self.release.wait()
+        if self.fail is not None:
+            raise self.fail
+        if self.empty:
+            return None
+        return {"properties": {"parameter": {p: {"20200101": float(i)} for i, p in enumerate(parameters)}}}
+
+
+@pytest.fixture
+def fake_fetch(monkeypatch):
+    fake = FakeFetch()
+    monkeypatch.setattr(nasa_client, "fetch", fake)
+    monkeypatch.setattr(nasa_client, "get_client", lambda: None)
+    monkeypatch.setattr(nasa_cache, "_disk", None)
+    nasa_cache._cache.clear()
+    nasa_cache._series_cache.clear()
+    yield fake
+    nasa_cache._cache.clear()
+    nasa_cache._series_cache.clear()
+    nasa_client._batches.clear()
+
+
+def _series(lat, lon, parameters):
+    return nasa_client.get_series(lat, lon, START, END, parameters)
+
+
+def test_concurrent_callers_share_one_download(fake_fetch):
+    async def main():
+        return await asyncio.gather(
+            _series(10.1, 20.1, ["T2M"]),
+            _series(10.2, 20.2, ["WS10M", "T2M"]),
+            _series(10.0, 20.0, ["PRECTOTCORR"]),
+        )
+
+    first, second, third = asyncio.run(main())
+
+    assert len(fake_fetch.calls) == 1
+    lat, lon, parameters = fake_fetch.calls[0]
+    assert (lat, lon) == nasa_cache.grid_cell(10.1, 20.1)
+    assert parameters == ("T2M", "WS10M", "PRECTOTCORR")
+    assert list(first) == ["T2M"]
+    assert list(second) == ["WS10M", "T2M"]
+    assert list(third) == ["PRECTOTCORR"]
+    assert second["T2M"] is first["T2M"]  # parsed once, shared
+    assert not nasa_client._batches
+
+
+def test_in_flight_batch_is_joined_when_it_covers_the_request(fake_fetch):
+    async def main():
+        fake_fetch.release = asyncio.Event()
+        first = asyncio.create_task(_series(10.0, 20.0, ["T2M", "WS10M"]))
+        await asyncio.sleep(nasa_client.BATCH_WINDOW * 2)
+        # The first batch is closed and waiting on the download now
+        joined = asyncio.create_task(_series(10.0, 20.0, ["WS10M"]))
+        extra = asyncio.create_task(_series(10.0, 20.0, ["RH2M"]))
+        await asyncio.sleep(0)
+        assert len(nasa_client._batches[nasa_cache.location_key(10.0, 20.0, START, END)]) == 2
+        fake_fetch.release.set()
+        return await asyncio.gather(first, joined, extra)
+
+    first, joined, extra = asyncio.run(main())
+
+    assert [call[2] for call in fake_fetch.calls] == [("T2M", "WS10M"), ("RH2M",)]
+    assert list(joined) == ["WS10M"]
+    assert joined["WS10M"] is first["WS10M"]
+    assert list(extra) == ["RH2M"]
+    assert not nasa_client._batches
+
+
+def test_download_error_reaches_every_waiter(fake_fetch):
+    fake_fetch.fail = RuntimeError("POWER unavailable")
+
+    async def main():
+        return await asyncio.gather(
+            _series(10.0, 20.0, ["T2M"]),
+            _series(10.0, 20.0, ["WS10M"]),
+            return_exceptions=True,
+        )
+
+    results = asyncio.run(main())
+
+    assert len(fake_fetch.calls) == 1
+    assert all(isinstance(r, RuntimeError) for r in results)
+    assert not nasa_client._batches
+    assert not nasa_cache._cache and not nasa_cache._series_cache
+
+
+def test_empty_download_returns_none(fake_fetch):
+    fake_fetch.empty = True
+
+    async def main():
+        return await asyncio.gather(
+            _series(10.0, 20.0, ["T2M"]),
+            _series(10.0, 20.0, ["WS10M"]),
+        )
+
+    assert asyncio.run(main()) == [None, None]
+    assert not nasa_client._batches
+
+
+def test_cancelled_waiter_does_not_cancel_the_batch(fake_fetch):
+    async def main():
+        fake_fetch.release = asyncio.Event()
+        cancelled = asyncio.create_task(_series(10.0, 20.0, ["T2M"]))
+        survivor = asyncio.create_task(_series(10.0, 20.0, ["WS10M"]))
+        await asyncio.sleep(nasa_client.BATCH_WINDOW * 2)
+        cancelled.cancel()
+        await asyncio.sleep(0)
+        fake_fetch.release.set()
+        result = await survivor
+        with pytest.raises(asyncio.CancelledError):
+            await cancelled
+        return result
+
+    result = asyncio.run(main())
+
+    assert len(fake_fetch.calls) == 1
+    assert list(result) == ["WS10M"]
+    assert not nasa_client._batches
+    # The cancelled caller's parameter was still downloaded and cached
+    assert list(nasa_cache.cached_series(10.0, 20.0, START, END, ["T2M"])) == ["T2M"]
+
+
+def test_series_are_parsed_once_for_a_batch(fake_fetch):
+    async def main():
+        return await asyncio.gather(
+            _series(10.0, 20.0, ["T2M"]),
+            _series(10.1, 20.1, ["T2M"]),
+        )
+
+    first, second = asyncio.run(main())
+
+    assert len(fake_fetch.calls) == 1
+    assert first["T2M"] is second["T2M"]
+    assert not nasa_client._batches
+    # Raw dicts leave memory once parsed
+    assert not nasa_cache._cache
+
+
+def test_cached_series_skip_the_download(fake_fetch):
+    asyncio.run(_series(10.0, 20.0, ["T2M", "WS10M"]))
+
+    result = asyncio.run(_series(10.1, 20.1, ["WS10M"]))
+
+    assert len(fake_fetch.calls) == 1
+    assert list(result) == ["WS10M"]
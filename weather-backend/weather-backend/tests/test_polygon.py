@@ -0,0 +1,72 @@
+# tests/test_polygon.py
+"""
+Batched polygon sampling checked against the original scalar implementation
+"""
+
+import numpy as np
+import pytest
+
+from utils.calculations import points_in_polygon, sample_polygon_to_grid
+
+
+def reference_point_in_polygon(lat, lon, polygon):
+    x, y = lon, lat
+    inside = False
+    n = len(polygon)
+    for i in range(n):
+        y1, x1 = polygon[i]
+        y2, x2 = polygon[(i + 1) % n]
+        if ((y1 > y) != (y2 > y)) and (x < (x2 - x1) * (y - y1) / (y2 - y1 + 1e-12) + x1):
+            inside = not inside
+    return inside
+
+
+def reference_sample_polygon_to_grid(polygon, step=0.5):
+    lats = [p[0] for p in polygon]
+    lons = [p[1] for p in polygon]
+    min_lat, max_lat = min(lats), max(lats)
+    min_lon, max_lon = min(lons), max(lons)
+    out = []
+    lat = round(min_lat / step) * step
+    while lat <= max_lat + 1e-9:
+        lon = round(min_lon / step) * step
+        while lon <= max_lon + 1e-9:
+            if reference_point_in_polygon(lat, lon, polygon):
+                out.append((lat, lon))
+            lon = round(lon + step, 6)
+        lat = round(lat + step, 6)
+    return out
+
+
+def random_polygon(rng):
+    # Star-shaped ring (possibly concave) around a random centre
+    n = int(rng.integers(3, 12))
+    angles = np.sort(rng.uniform(0, 2 * np.pi, n))
+    radii = rng.uniform(0.2, 4.0, n)
+    lat0, lon0 = rng.uniform(-60, 60), rng.uniform(-170, 170)
+    return [(float(lat0 + r * np.sin(a)), float(lon0 + r * np.cos(a))) for a, r in zip(angles, radii)]
+
+
+POLYGONS = [random_polygon(np.random.default_rng(seed)) for seed in range(40)] + [
+    # Vertices and edges on grid nodes
+    [(10.0, 20.0), (10.0, 22.0), (12.0, 22.0), (12.0, 20.0)],
+    [(0.0, 0.0), (1.5, 3.0), (3.0, 0.0)],
+]
+
+
+@pytest.mark.parametrize("polygon", POLYGONS)
+def test_points_in_polygon_matches_reference(kernels, polygon):
+    rng = np.random.default_rng(len(polygon))
+    poly = np.asarray(polygon)
+    lats = rng.uniform(poly[:, 0].min() - 1, poly[:, 0].max() + 1, 500)
+    lons = rng.uniform(poly[:, 1].min() - 1, poly[:, 1].max() + 1, 500)
+
+    inside = points_in_polygon(lats, lons, polygon)
+
+    assert inside.tolist() == [reference_point_in_polygon(a, b, polygon) for a, b in zip(lats, lons)]
+
+
+@pytest.mark.parametrize("step", [0.5, 0.25])
+@pytest.mark.parametrize("polygon", POLYGONS)
+def test_sample_polygon_to_grid_matches_reference(kernels, polygon, step):
+    assert sample_polygon_to_grid(polygon, step) == reference_sample_polygon_to_grid(polygon, step)
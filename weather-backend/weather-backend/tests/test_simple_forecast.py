@@ -0,0 +1,163 @@
+# tests/test_simple_forecast.py
+"""
+/api/simple-forecast/ checked against the original dict-based implementation
+"""
+
+import statistics
+
+import numpy as np
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from models import MAX_AREA_SAMPLES
+from routers import simple_forecast
+from routers.simple_forecast import FORECAST_PARAMETERS, THRESHOLDS
+from utils.parsed_series import MISSING_VALUE, ParsedSeries
+
+DATES = [
+    str(d).replace("-", "")
+    for d in np.arange(np.datetime64("2005-01-01"), np.datetime64("2025-01-01"))
+]
+
+# (low, high) of the random 2-decimal values per parameter
+RANGES = {
+    "T2M_MAX": (25, 45),
+    "T2M_MIN": (5, 25),
+    "PRECTOTCORR": (0, 60),
+    "WS10M": (0, 20),
+    "RH2M": (30, 100),
+}
+
+
+def random_params(seed):
+    rng = np.random.default_rng(seed)
+    params = {}
+    for parameter in FORECAST_PARAMETERS:
+        low, high = RANGES[parameter]
+        values = np.round(rng.uniform(low, high, len(DATES)), 2)
+        values[rng.random(len(DATES)) < 0.05] = MISSING_VALUE
+        params[parameter] = dict(zip(DATES, values.tolist()))
+    return params
+
+
+def reference_filter_by_date(data, target_month, target_day):
+    return [
+        v for k, v in data.items()
+        if v != MISSING_VALUE and k.isdigit() and int(k[4:6]) == target_month and int(k[6:8]) == target_day
+    ]
+
+
+def reference_probability(values, threshold):
+    if not values:
+        return 0.0
+    return round(sum(1 for v in values if v > threshold) / len(values) * 100, 1)
+
+
+def reference_forecast(params, month, day):
+    temp_max_data = reference_filter_by_date(params["T2M_MAX"], month, day)
+    temp_min_data = reference_filter_by_date(params["T2M_MIN"], month, day)
+    precip_data = reference_filter_by_date(params["PRECTOTCORR"], month, day)
+    wind_data = reference_filter_by_date(params["WS10M"], month, day)
+    humidity_data = reference_filter_by_date(params["RH2M"], month, day)
+    return {
+        "temperature": {
+            "max": round(max(temp_max_data), 1),
+            "min": round(min(temp_min_data), 1),
+            "average_max": round(statistics.mean(temp_max_data), 1),
+            "hot_probability": reference_probability(temp_max_data, THRESHOLDS["hot"]),
+            "very_hot_probability": reference_probability(temp_max_data, THRESHOLDS["very_hot"]),
+            "unit": "°C",
+        },
+        "precipitation": {
+            "rain_probability": reference_probability(precip_data, THRESHOLDS["rain"]),
+            "heavy_rain_probability": reference_probability(precip_data, THRESHOLDS["heavy_rain"]),
+            "unit": "%",
+        },
+        "wind": {
+            "high_wind_probability": reference_probability(wind_data, THRESHOLDS["high_wind"]),
+            "average_speed": round(statistics.mean(wind_data), 1),
+            "unit": "m/s",
+        },
+        "humidity": {
+            "high_humidity_probability": reference_probability(humidity_data, THRESHOLDS["high_humidity"]),
+            "average": round(statistics.mean(humidity_data), 1),
+            "unit": "%",
+        },
+        "data_points_analyzed": len(temp_max_data),
+    }
+
+
+@pytest.fixture
+def client(monkeypatch):
+    raw = {}
+
+    async def fake_get_series(lat, lon, start_date, end_date, parameters):
+        return {p: ParsedSeries.from_param_data(raw[lat][p]) for p in parameters}
+
+    monkeypatch.setattr(simple_forecast, "get_series", fake_get_series)
+    simple_forecast._response_cache.clear()
+    app = FastAPI()
+    app.include_router(simple_forecast.router)
+    yield TestClient(app), raw
+    simple_forecast._response_cache.clear()
+
+
+@pytest.mark.parametrize("date", ["2025-06-15", "2025-01-01", "2025-12-31"])
+def test_forecast_matches_reference(client, date):
+    client, raw = client
+    month, day = int(date[5:7]), int(date[8:10])
+
+    for seed in range(100):
+        lat = float(seed % 90)
+        raw[lat] = random_params(seed)
+
+        response = client.get("/api/simple-forecast/", params={"lat": lat, "lon": 10.0, "date": date})
+
+        assert response.status_code == 200
+        body = response.json()
+        expected = reference_forecast(raw[lat], month, day)
+        for key, value in expected.items():
+            assert body[key] == value, (seed, key)
+        simple_forecast._response_cache.clear()
+
+
+def test_forecast_with_unequal_date_axes(client):
+    client, raw = client
+    params = random_params(7)
+    # Parameters are cached separately: one lost some days, another carries a malformed key
+    params["RH2M"] = {k: v for i, (k, v) in enumerate(params["RH2M"].items()) if i % 3}
+    params["WS10M"] = {"bogus": 1.0, **params["WS10M"]}
+    raw[5.0] = params
+
+    for date in ["2025-06-15", "2025-06-16", "2025-06-17"]:
+        response = client.get("/api/simple-forecast/", params={"lat": 5.0, "lon": 10.0, "date": date})
+
+        assert response.status_code == 200
+        body = response.json()
+        for key, value in reference_forecast(params, 6, int(date[8:10])).items():
+            assert body[key] == value, (date, key)
+
+
+def test_area_over_the_sample_cap_is_rejected(client, monkeypatch):
+    client, _ = client
+    fetched = []
+
+    async def fake_points(points, start_date, end_date, parameters):
+        fetched.append(points)
+        return [None] * len(points)
+
+    monkeypatch.setattr(simple_forecast, "get_cached_series_for_points", fake_points)
+    square = [{"lat": 0, "lon": 0}, {"lat": 0, "lon": 20}, {"lat": 20, "lon": 20}, {"lat": 20, "lon": 0}]
+
+    response = client.post("/api/simple-forecast/area", json={"polygon": square, "date": "2025-06-15"})
+
+    assert response.status_code == 400
+    assert str(MAX_AREA_SAMPLES) in response.json()["detail"]
+    assert not fetched
+
+    points = [{"lat": 0, "lon": i * 0.01} for i in range(MAX_AREA_SAMPLES + 1)]
+    response = client.post("/api/simple-forecast/area", json={"points": points, "date": "2025-06-15"})
+
+    assert response.status_code == 422
+    assert not fetched
@@ -0,0 +1,34 @@
+# tests/test_thresholds.py
+"""
+evaluate_all checked against a strict count per condition
+"""
+
+import numpy as np
+import pytest
+
+from services.thresholds import EXTREME_WEATHER_THRESHOLDS, evaluate_all
+
+PARAMETERS = sorted({cfg["parameter"] for cfg in EXTREME_WEATHER_THRESHOLDS.values()})
+
+
+@pytest.mark.parametrize("parameter", PARAMETERS)
+def test_evaluate_all_matches_per_condition_counts(parameter):
+    conditions = {name: cfg for name, cfg in EXTREME_WEATHER_THRESHOLDS.items() if cfg["parameter"] == parameter}
+    rng = np.random.default_rng(len(parameter))
+    # Every threshold appears as a value so the strict comparisons are exercised
+    thresholds = [cfg["default_threshold"] for cfg in conditions.values()]
+    values = np.concatenate([np.round(rng.uniform(-20, 100, 2000), 1), np.repeat(thresholds, 50)]).astype(np.float32)
+
+    result = evaluate_all(parameter, values)
+
+    expected = {}
+    for name, cfg in conditions.items():
+        threshold = cfg["default_threshold"]
+        hits = values > threshold if cfg["condition"] == "above" else values < threshold
+        expected[name] = round(np.count_nonzero(hits) / values.size, 3)
+    assert result == expected
+
+
+def test_evaluate_all_without_values_or_conditions():
+    assert evaluate_all("T2M_MAX", np.array([], dtype=np.float32)) == {}
+    assert evaluate_all("SNODP", np.arange(5.0)) == {}
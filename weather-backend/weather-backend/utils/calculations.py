@@ -1,85 +1,95 @@
 # utils/calculations.py - COMPLETE FILE
 
-from datetime import datetime
+from functools import lru_cache
 import numpy as np
-from typing import Dict, List, Tuple, Optional
+from typing import Dict, List, Tuple, Optional, Union
+
+from utils.parsed_series import ParsedSeries
+from utils.kernels_numba import PROB_FN, TREND_FN, histogram_counts, summary_stats, ray_cast
 
 # ========== EXISTING FUNCTIONS (keep these) ==========
 
-def filter_data_by_month(param_data, month):
-    """
-    Filter historical data for a specific month
-    
-    Args:
-        param_data: Dictionary with date strings as keys
-        month: Month number (1-12)
-    
-    Returns:
-        Filtered dictionary
-    """
-    filtered = {}
-    for date_str, value in param_data.items():
-        try:
-            date_obj = datetime.strptime(date_str, "%Y%m%d")
-            if date_obj.month == month:
-                filtered[date_str] = value
-        except:
-            continue
-    return filtered
-
-def calculate_probability(filtered_data, threshold, condition_type):
+def calculate_probability(values: np.ndarray, mask: np.ndarray, threshold, condition_type):
     """
     Calculate probability of weather condition occurring
     
     Args:
-        filtered_data: Dictionary of date:value pairs
+        values: ParsedSeries.values array
+        mask: Boolean selection mask (should already exclude missing values)
         threshold: Threshold value
         condition_type: "above" or "below"
     
     Returns:
         Probability (0.0 to 1.0) or None if insufficient data
     """
-    if not filtered_data:
+    probability = PROB_FN[condition_type](values, mask, threshold)
+    if np.isnan(probability):
         return None
     
-    # Filter out invalid values (NASA uses -999 for missing data)
-    values = [v for v in filtered_data.values() if v is not None and v != -999]
+    return round(float(probability), 3)
+
+def probs_above_many(values, thresholds) -> np.ndarray:
+    """
+    Fraction of values strictly above each threshold, from one sort
+    
+    Args:
+        values: 1-D array without missing values
+        thresholds: Sequence of thresholds
     
-    if not values:
-        return None
+    Returns:
+        Array aligned with thresholds (zeros if values is empty)
+    """
+    s = np.sort(np.asarray(values))
+    if not s.size:
+        return np.zeros(len(thresholds))
+    idx = np.searchsorted(s, np.asarray(thresholds), side="right")
+    return (s.size - idx) / s.size
+
+def probs_below_many(values, thresholds) -> np.ndarray:
+    """
+    Fraction of values strictly below each threshold, from one sort
     
-    if condition_type == "above":
-        exceeding_count = sum(1 for v in values if v > threshold)
-    else:
-        exceeding_count = sum(1 for v in values if v < threshold)
+    Args:
+        values: 1-D array without missing values
+        thresholds: Sequence of thresholds
     
-    probability = exceeding_count / len(values)
-    return round(probability, 3)
+    Returns:
+        Array aligned with thresholds (zeros if values is empty)
+    """
+    s = np.sort(np.asarray(values))
+    if not s.size:
+        return np.zeros(len(thresholds))
+    idx = np.searchsorted(s, np.asarray(thresholds), side="left")
+    return idx / s.size
 
-def calculate_extreme_statistics(filtered_data):
+def calculate_extreme_statistics(values: np.ndarray, mask: np.ndarray):
     """
     Calculate additional statistics for extreme events
     
     Args:
-        filtered_data: Dictionary of date:value pairs
+        values: ParsedSeries.values array
+        mask: Boolean selection mask (should already exclude missing values)
     
     Returns:
         Dictionary with max, min, average, and data_points
     """
-    values = [v for v in filtered_data.values() if v is not None and v != -999]
+    selected = values[mask]
     
-    if not values:
+    if not selected.size:
         return None
     
     return {
-        "max": round(max(values), 2),
-        "min": round(min(values), 2),
-        "average": round(sum(values) / len(values), 2),
-        "data_points": len(values)
+        "max": round(float(selected.max()), 2),
+        "min": round(float(selected.min()), 2),
+        "average": round(float(selected.mean(dtype=np.float64)), 2),
+        "data_points": int(selected.size)
     }
 
 # ========== NEW FUNCTIONS (add these) ==========
 
+# Elementwise comparison for a condition, e.g. COMPARE["above"](values, threshold)
+COMPARE = {"above": np.greater, "below": np.less}
+
 SEASON_MONTHS = {
     "djf": {12, 1, 2},
     "mam": {3, 4, 5},
@@ -87,114 +97,173 @@ SEASON_MONTHS = {
     "son": {9, 10, 11},
 }
 
-def filter_by_year_range(param_data: Dict[str, float], start_year: Optional[int], end_year: Optional[int]) -> Dict[str, float]:
-    if not start_year and not end_year:
-        return param_data
-    out = {}
-    for d, v in param_data.items():
-        try:
-            y = int(d[:4])
-            if (start_year is None or y >= start_year) and (end_year is None or y <= end_year):
-                out[d] = v
-        except:
-            continue
-    return out
-
-def filter_by_season(param_data: Dict[str, float], season: Optional[str]) -> Dict[str, float]:
-    if not season:
-        return param_data
-    months = SEASON_MONTHS[season]
-    out = {}
-    for d, v in param_data.items():
-        try:
-            m = int(d[4:6])
-            if m in months:
-                out[d] = v
-        except:
-            continue
-    return out
-
-def filter_by_doy(param_data: Dict[str, float], doy: Optional[int]) -> Dict[str, float]:
-    if not doy:
-        return param_data
-    out = {}
-    for d, v in param_data.items():
-        try:
-            dt = datetime.strptime(d, "%Y%m%d")
-            if dt.timetuple().tm_yday == doy:
-                out[d] = v
-        except:
-            continue
-    return out
-
-def summarize_values(values: List[float]):
-    if not values:
+# ----- Boolean-mask filters over a ParsedSeries -----
+
+def month_mask(series: ParsedSeries, month: int) -> np.ndarray:
+    return series.valid_mask & (series.months == month)
+
+def season_mask(series: ParsedSeries, season: str) -> np.ndarray:
+    return series.valid_mask & np.isin(series.months, list(SEASON_MONTHS[season]))
+
+def doy_mask(series: ParsedSeries, doy: int) -> np.ndarray:
+    return series.valid_mask & (series.doys == doy)
+
+def year_range_mask(series: ParsedSeries, start_year: Optional[int], end_year: Optional[int]) -> np.ndarray:
+    mask = series.valid_mask.copy()
+    if start_year:
+        mask &= series.years >= start_year
+    if end_year:
+        mask &= series.years <= end_year
+    return mask
+
+def select_mask(
+    series: ParsedSeries,
+    month: Optional[int] = None,
+    season: Optional[str] = None,
+    doy: Optional[int] = None,
+    start_year: Optional[int] = None,
+    end_year: Optional[int] = None,
+) -> np.ndarray:
+    # Year window always applies; then the most specific of doy > season > month
+    mask = year_range_mask(series, start_year, end_year)
+    if doy:
+        mask &= doy_mask(series, doy)
+    elif season:
+        mask &= season_mask(series, season)
+    elif month:
+        mask &= month_mask(series, month)
+    return mask
+
+def summarize_values(values):
+    if len(values) == 0:
         return None
-    arr = np.array(values, dtype=float)
+    arr = np.asarray(values)
+    if arr.dtype not in (np.float32, np.float64):
+        arr = arr.astype(np.float64)
+    mean, median, p75, p95 = summary_stats(arr)
     return {
-        "mean": round(float(np.nanmean(arr)), 2),
-        "median": round(float(np.nanmedian(arr)), 2),
-        "p75": round(float(np.nanpercentile(arr, 75)), 2),
-        "p95": round(float(np.nanpercentile(arr, 95)), 2),
+        "mean": round(float(mean), 2),
+        "median": round(float(median), 2),
+        "p75": round(float(p75), 2),
+        "p95": round(float(p95), 2),
         "count": int(arr.size),
     }
 
-def make_histogram(values: List[float], bins:int=24):
-    if not values:
+# Static bin edges per parameter, opted into with bins="fixed": no min/max pass, and
+# histograms of the same parameter line up across locations. Values outside the
+# edges are reported as underflow/overflow counts rather than binned.
+_FIXED_EDGES = {
+    "T2M": np.arange(-50, 51, 2, dtype=np.float64),
+    "T2M_MAX": np.arange(-40, 57, 2, dtype=np.float64),
+    "T2M_MIN": np.arange(-60, 41, 2, dtype=np.float64),
+    "PRECTOTCORR": np.array([0, 1, 5, 10, 25, 50, 100, 200, 500], dtype=np.float64),
+    "WS10M": np.arange(0, 41, 2, dtype=np.float64),
+    "RH2M": np.arange(0, 101, 5, dtype=np.float64),
+    "CLOUD_AMT": np.arange(0, 101, 5, dtype=np.float64),
+}
+_EDGES_JSON = {p: [round(float(b), 3) for b in e.tolist()] for p, e in _FIXED_EDGES.items()}
+# histogram_counts assumes equal-width edges; uneven ones go through np.histogram
+_UNIFORM_EDGES = {p for p, e in _FIXED_EDGES.items() if np.allclose(np.diff(e), e[1] - e[0])}
+
+def has_fixed_edges(parameter: Optional[str]) -> bool:
+    return parameter in _FIXED_EDGES
+
+def make_histogram(values, bins: Union[int, str] = 24, parameter: Optional[str] = None):
+    # bins="fixed" uses the parameter's static edges; callers check has_fixed_edges first
+    if bins == "fixed" and not has_fixed_edges(parameter):
+        raise ValueError(f"No fixed histogram edges for parameter {parameter!r}")
+    if len(values) == 0:
         return {"bins": [], "counts": []}
-    counts, bin_edges = np.histogram(values, bins=bins)
+    arr = np.asarray(values)
+    if arr.dtype not in (np.float32, np.float64):
+        arr = arr.astype(np.float64)
+    arr = arr[~np.isnan(arr)]
+
+    if bins == "fixed":
+        edges = _FIXED_EDGES[parameter]
+        if parameter in _UNIFORM_EDGES:
+            counts = histogram_counts(arr, edges)
+        else:
+            counts, _ = np.histogram(arr, bins=edges)
+        return {
+            "bins": _EDGES_JSON[parameter],
+            "counts": counts.tolist(),
+            "underflow": int(np.count_nonzero(arr < edges[0])),
+            "overflow": int(np.count_nonzero(arr > edges[-1])),
+        }
+
+    bin_edges = np.histogram_bin_edges(arr, bins=bins).astype(np.float64)
+    counts = histogram_counts(arr, bin_edges)
     return {
         "bins": [round(float(b), 3) for b in bin_edges.tolist()],
         "counts": counts.tolist()
     }
 
-def analyze_trend_yearly_extremes(param_data: Dict[str, float], threshold: float, condition_type: str):
+def make_histograms(values_by_parameter: Dict[str, np.ndarray], bins: Union[int, str] = "fixed"):
+    # Dashboard batch: one histogram per parameter, sharing the fixed edges
+    return {p: make_histogram(v, bins=bins, parameter=p) for p, v in values_by_parameter.items()}
+
+def analyze_trend_yearly_extremes(series: ParsedSeries, mask: np.ndarray, threshold: float, condition_type: str):
     # Count extreme-event days per year, then fit trend line
-    yearly = {}
-    for d, v in param_data.items():
-        try:
-            if v is None or v == -999:
-                continue
-            y = int(d[:4])
-            ok = v > threshold if condition_type == "above" else v < threshold
-            if ok:
-                yearly[y] = yearly.get(y, 0) + 1
-        except:
-            continue
-    if not yearly:
+    years, counts = TREND_FN[condition_type](series.years, series.values, mask, threshold)
+    if not years.size:
         return {"yearly_counts": {}, "slope": 0.0, "trend": "flat"}
-    years = np.array(sorted(yearly.keys()))
-    counts = np.array([yearly[y] for y in years], dtype=float)
-    slope, intercept = np.polyfit(years, counts, 1)
+    # Closed-form least-squares slope, cov(x, y) / var(x); no Vandermonde/lstsq for ~20 points
+    x = years.astype(np.float64)
+    y = counts.astype(np.float64)
+    dx = x - x.mean()
+    sxx = np.dot(dx, dx)
+    slope = np.dot(dx, y - y.mean()) / sxx if sxx else 0.0
     trend = "increasing" if slope > 0 else ("decreasing" if slope < 0 else "flat")
     return {"yearly_counts": {int(y): int(c) for y, c in zip(years, counts)}, "slope": round(float(slope), 4), "trend": trend}
 
 # ----- Polygon sampling aligned to ~0.5° POWER daily grid -----
 
-def _point_in_polygon(lat: float, lon: float, polygon: List[Tuple[float, float]]) -> bool:
-    # Ray casting algorithm
-    x, y = lon, lat
-    inside = False
-    n = len(polygon)
-    for i in range(n):
-        x1, y1 = polygon[i][1], polygon[i][0]
-        x2, y2 = polygon[(i+1) % n][1], polygon[(i+1) % n][0]
-        if ((y1 > y) != (y2 > y)) and (x < (x2 - x1) * (y - y1) / (y2 - y1 + 1e-12) + x1):
-            inside = not inside
-    return inside
+def points_in_polygon(lats, lons, polygon: List[Tuple[float, float]]) -> np.ndarray:
+    # Batched ray casting: boolean mask of which (lat, lon) pairs fall inside polygon
+    poly = np.asarray(polygon, dtype=float)
+    return ray_cast(
+        np.asarray(lons, dtype=float).ravel(), np.asarray(lats, dtype=float).ravel(),
+        np.ascontiguousarray(poly[:, 1]), np.ascontiguousarray(poly[:, 0])
+    )
+
+def _grid_axis(lo: float, hi: float, step: float) -> np.ndarray:
+    # Grid-aligned coordinates from the snapped lower bound up to hi
+    start = round(lo / step) * step
+    n = max(int(np.floor((hi + 1e-9 - start) / step)) + 1, 0)
+    axis = np.round(start + step * np.arange(n), 6)
+    axis[:1] = start
+    return axis
 
 def sample_polygon_to_grid(polygon: List[Tuple[float, float]], step: float = 0.5) -> List[Tuple[float, float]]:
-    lats = [p[0] for p in polygon]
-    lons = [p[1] for p in polygon]
-    min_lat, max_lat = min(lats), max(lats)
-    min_lon, max_lon = min(lons), max(lons)
-    points = []
-    lat = round(min_lat / step) * step
-    while lat <= max_lat + 1e-9:
-        lon = round(min_lon / step) * step
-        while lon <= max_lon + 1e-9:
-            if _point_in_polygon(lat, lon, polygon):
-                points.append((lat, lon))
-            lon = round(lon + step, 6)
-        lat = round(lat + step, 6)
-    return points
+    poly = np.asarray(polygon, dtype=float)
+    lat_axis = _grid_axis(poly[:, 0].min(), poly[:, 0].max(), step)
+    lon_axis = _grid_axis(poly[:, 1].min(), poly[:, 1].max(), step)
+    # Rows follow latitude so the ravelled order matches a lat-major scan
+    lons, lats = np.meshgrid(lon_axis, lat_axis)
+    lats, lons = lats.ravel(), lons.ravel()
+    inside = points_in_polygon(lats, lons, polygon)
+    return list(zip(lats[inside].tolist(), lons[inside].tolist()))
+
+@lru_cache(maxsize=1024)
+def _sample_polygon_key(poly_key: Tuple[Tuple[float, float], ...], step: float) -> Tuple[Tuple[float, float], ...]:
+    return tuple(sample_polygon_to_grid(list(poly_key), step))
+
+def sample_polygon_to_grid_cached(polygon: List[Tuple[float, float]], step: float = 0.5) -> Tuple[Tuple[float, float], ...]:
+    # Polygons are content-addressed by their (rounded) vertex ring, so no invalidation is needed
+    poly_key = tuple((round(lat, 4), round(lon, 4)) for lat, lon in polygon)
+    return _sample_polygon_key(poly_key, step)
+
+def sample_area(points, polygon, step: float = 0.5) -> List[Tuple[float, float]]:
+    # Explicit points plus the polygon sampled on the grid (its centroid if no grid node falls inside);
+    # points/polygon are sequences of models.Coordinate or None
+    samples: List[Tuple[float, float]] = []
+    if points:
+        samples.extend((p.lat, p.lon) for p in points)
+    if polygon:
+        poly = [(c.lat, c.lon) for c in polygon]
+        sampled = sample_polygon_to_grid_cached(poly, step=step)
+        if not sampled:  # fallback to polygon centroid
+            sampled = [tuple(np.mean(np.array(poly), axis=0).tolist())]
+        samples.extend(sampled)
+    return samples
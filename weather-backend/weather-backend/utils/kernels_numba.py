@@ -0,0 +1,230 @@
+# utils/kernels_numba.py
+"""
+Numeric kernels behind utils/calculations.py.
+Compiled ahead of the first request with Numba when it is installed;
+otherwise the equivalent NumPy implementations below are used.
+
+All kernels expect `mask` to already exclude missing values.
+"""
+
+import numpy as np
+
+try:
+    from numba import njit
+    HAS_NUMBA = True
+except ImportError:  # Numba is optional
+    HAS_NUMBA = False
+
+
+if HAS_NUMBA:
+    # Explicit signatures compile at import time, so no request pays JIT latency
+    # Separate above/below kernels: the comparison is fixed at compile time
+    # instead of being re-tested per element. Result is NaN when nothing is selected.
+    @njit(
+        [
+            "float64(float64[:], boolean[:], float64)",
+            "float64(float32[:], boolean[:], float32)",
+        ],
+        cache=True, fastmath=True,
+    )
+    def prob_above(values, mask, threshold):
+        hits = 0
+        total = 0
+        for i in range(values.shape[0]):
+            if mask[i]:
+                total += 1
+                if values[i] > threshold:
+                    hits += 1
+        return hits / total if total else np.nan
+
+    @njit(
+        [
+            "float64(float64[:], boolean[:], float64)",
+            "float64(float32[:], boolean[:], float32)",
+        ],
+        cache=True, fastmath=True,
+    )
+    def prob_below(values, mask, threshold):
+        hits = 0
+        total = 0
+        for i in range(values.shape[0]):
+            if mask[i]:
+                total += 1
+                if values[i] < threshold:
+                    hits += 1
+        return hits / total if total else np.nan
+
+    @njit(
+        [
+            "int64[:](float64[:], float64[:])",
+            "int64[:](float32[:], float64[:])",
+        ],
+        cache=True,
+    )
+    def histogram_counts(values, edges):
+        # Same binning as np.histogram with equal-width edges (last bin closed)
+        bins = edges.shape[0] - 1
+        counts = np.zeros(bins, dtype=np.int64)
+        lo = edges[0]
+        hi = edges[bins]
+        norm = bins / (hi - lo)
+        for i in range(values.shape[0]):
+            v = values[i]
+            if v < lo or v > hi:
+                continue
+            idx = int((v - lo) * norm)
+            if idx >= bins:
+                idx = bins - 1
+            # Correct float rounding against the actual edges, as NumPy does
+            if v < edges[idx]:
+                idx -= 1
+            elif v >= edges[idx + 1] and idx != bins - 1:
+                idx += 1
+            counts[idx] += 1
+        return counts
+
+    @njit(cache=True)
+    def _quantile_sorted(s, q):
+        pos = q * (s.shape[0] - 1)
+        lo = int(np.floor(pos))
+        hi = min(lo + 1, s.shape[0] - 1)
+        return s[lo] + (s[hi] - s[lo]) * (pos - lo)
+
+    @njit(
+        [
+            "UniTuple(float64, 4)(float64[:])",
+            "UniTuple(float64, 4)(float32[:])",
+        ],
+        cache=True,
+    )
+    def summary_stats(values):
+        # (mean, median, p75, p95) ignoring NaN, from a single sort
+        s = np.sort(values[~np.isnan(values)]).astype(np.float64)
+        if s.shape[0] == 0:
+            return np.nan, np.nan, np.nan, np.nan
+        return s.mean(), _quantile_sorted(s, 0.5), _quantile_sorted(s, 0.75), _quantile_sorted(s, 0.95)
+
+    @njit(cache=True)
+    def _count_by_year(years, hits):
+        # Years with at least one hit, and the number of hits in each
+        found = False
+        first = 0
+        last = 0
+        for i in range(hits.shape[0]):
+            if hits[i]:
+                if not found:
+                    first = last = years[i]
+                    found = True
+                else:
+                    first = min(first, years[i])
+                    last = max(last, years[i])
+        if not found:
+            return np.empty(0, dtype=np.int32), np.empty(0, dtype=np.int64)
+
+        per_year = np.zeros(last - first + 1, dtype=np.int64)
+        for i in range(hits.shape[0]):
+            if hits[i]:
+                per_year[years[i] - first] += 1
+
+        n = 0
+        for c in per_year:
+            if c:
+                n += 1
+        out_years = np.empty(n, dtype=np.int32)
+        out_counts = np.empty(n, dtype=np.int64)
+        j = 0
+        for k in range(per_year.shape[0]):
+            if per_year[k]:
+                out_years[j] = first + k
+                out_counts[j] = per_year[k]
+                j += 1
+        return out_years, out_counts
+
+    @njit(
+        [
+            "Tuple((int32[:], int64[:]))(int32[:], float64[:], boolean[:], float64)",
+            "Tuple((int32[:], int64[:]))(int32[:], float32[:], boolean[:], float32)",
+        ],
+        cache=True, fastmath=True,
+    )
+    def yearly_counts_above(years, values, mask, threshold):
+        hits = np.empty(values.shape[0], dtype=np.bool_)
+        for i in range(values.shape[0]):
+            hits[i] = mask[i] and values[i] > threshold
+        return _count_by_year(years, hits)
+
+    @njit(
+        [
+            "Tuple((int32[:], int64[:]))(int32[:], float64[:], boolean[:], float64)",
+            "Tuple((int32[:], int64[:]))(int32[:], float32[:], boolean[:], float32)",
+        ],
+        cache=True, fastmath=True,
+    )
+    def yearly_counts_below(years, values, mask, threshold):
+        hits = np.empty(values.shape[0], dtype=np.bool_)
+        for i in range(values.shape[0]):
+            hits[i] = mask[i] and values[i] < threshold
+        return _count_by_year(years, hits)
+
+    @njit("boolean[:](float64[:], float64[:], float64[:], float64[:])", cache=True)
+    def ray_cast(xs, ys, poly_x, poly_y):
+        # Even-odd point-in-polygon test for every (xs[i], ys[i])
+        n = poly_x.shape[0]
+        inside = np.zeros(xs.shape[0], dtype=np.bool_)
+        for i in range(xs.shape[0]):
+            x = xs[i]
+            y = ys[i]
+            flag = False
+            for j in range(n):
+                x1 = poly_x[j]
+                y1 = poly_y[j]
+                x2 = poly_x[(j + 1) % n]
+                y2 = poly_y[(j + 1) % n]
+                if ((y1 > y) != (y2 > y)) and (x < (x2 - x1) * (y - y1) / (y2 - y1 + 1e-12) + x1):
+                    flag = not flag
+            inside[i] = flag
+        return inside
+
+else:
+    def prob_above(values, mask, threshold):
+        selected = values[mask]
+        return np.count_nonzero(selected > threshold) / selected.size if selected.size else np.nan
+
+    def prob_below(values, mask, threshold):
+        selected = values[mask]
+        return np.count_nonzero(selected < threshold) / selected.size if selected.size else np.nan
+
+    def histogram_counts(values, edges):
+        counts, _ = np.histogram(values, bins=edges)
+        return counts
+
+    def summary_stats(values):
+        values = values.astype(np.float64)  # interpolate in float64, as the Numba kernel does
+        return (
+            float(np.nanmean(values)),
+            float(np.nanmedian(values)),
+            float(np.nanpercentile(values, 75)),
+            float(np.nanpercentile(values, 95)),
+        )
+
+    def yearly_counts_above(years, values, mask, threshold):
+        return np.unique(years[mask & (values > threshold)], return_counts=True)
+
+    def yearly_counts_below(years, values, mask, threshold):
+        return np.unique(years[mask & (values < threshold)], return_counts=True)
+
+    def ray_cast(xs, ys, poly_x, poly_y):
+        # One vectorized pass per polygon edge, toggling points whose ray crosses it
+        n = poly_x.shape[0]
+        inside = np.zeros(xs.shape[0], dtype=bool)
+        for j in range(n):
+            x1, y1 = poly_x[j], poly_y[j]
+            x2, y2 = poly_x[(j + 1) % n], poly_y[(j + 1) % n]
+            crosses = (y1 > ys) != (y2 > ys)
+            inside ^= crosses & (xs < (x2 - x1) * (ys - y1) / (y2 - y1 + 1e-12) + x1)
+        return inside
+
+
+# Resolve the condition once per request: PROB_FN[cond](values, mask, threshold)
+PROB_FN = {"above": prob_above, "below": prob_below}
+TREND_FN = {"above": yearly_counts_above, "below": yearly_counts_below}
@@ -0,0 +1,65 @@
+# utils/parsed_series.py
+"""
+Columnar (NumPy) view of a NASA POWER daily series.
+The {YYYYMMDD: value} dict is parsed once; every filter afterwards is a boolean mask.
+Values are float32 with missing data (-999 / None) stored as NaN.
+"""
+
+from dataclasses import dataclass
+from typing import Dict
+import numpy as np
+
+MISSING_VALUE = -999
+
+# Days elapsed before the 1st of each month in a common year (index = month 1-12)
+_DAYS_BEFORE_MONTH = np.array([0, 0, 31, 59, 90, 120, 151, 181, 212, 243, 273, 304, 334], dtype=np.int32)
+
+
+def is_date_key(key: str) -> bool:
+    """True for a well-formed YYYYMMDD key; checked once at ingest so filters need no guards"""
+    return len(key) == 8 and key.isdigit()
+
+
+@dataclass(frozen=True)
+class ParsedSeries:
+    dates: np.ndarray       # int32 YYYYMMDD
+    years: np.ndarray       # int32
+    months: np.ndarray      # int32 1-12
+    doys: np.ndarray        # int32 1-366
+    values: np.ndarray      # float32, NaN where missing
+    valid_mask: np.ndarray  # bool, False where values is NaN
+
+    @property
+    def nbytes(self) -> int:
+        return sum(a.nbytes for a in (self.dates, self.years, self.months, self.doys, self.values, self.valid_mask))
+
+    def published_values(self, mask) -> np.ndarray:
+        """float64 values on mask, rounded back to the 2 decimals POWER publishes (undoes the float32 storage)"""
+        return np.round(self.values[mask].astype(np.float64), 2)
+
+    @classmethod
+    def from_param_data(cls, param_data: Dict[str, float]) -> "ParsedSeries":
+        # Validate keys once here; malformed ones (never expected from POWER) are dropped
+        if not all(map(is_date_key, param_data)):
+            param_data = {k: v for k, v in param_data.items() if is_date_key(k)}
+        n = len(param_data)
+        dates = np.fromiter(map(int, param_data.keys()), dtype=np.int32, count=n)
+        values = np.fromiter(
+            (np.nan if v is None else v for v in param_data.values()), dtype=np.float32, count=n
+        )
+        values[values == MISSING_VALUE] = np.nan
+
+        years = dates // 10000
+        months = (dates // 100) % 100
+        days = dates % 100
+        leap = (years % 4 == 0) & ((years % 100 != 0) | (years % 400 == 0))
+        doys = _DAYS_BEFORE_MONTH[months] + days + (leap & (months > 2))
+
+        return cls(
+            dates=dates,
+            years=years,
+            months=months,
+            doys=doys.astype(np.int32),
+            values=values,
+            valid_mask=~np.isnan(values),
+        )